@@ -25,8 +25,10 @@ from models import Base
 
 # Importeer models apart (zorgt dat ze geregistreerd worden bij Base)
 from models.user import User
-from models.items import Item
-from models.orders import Order, OrderItem
+from models.items import Item, ItemFacetCount
+from models.orders import Order, OrderItem, ArchivedOrder, ArchivedOrderItem
+from models.analytics import SalesDaily, SalesItemDaily, SalesCategoryDaily, SalesCityDaily
+from models.inventory import ItemStockShard, StockReservation
 
 target_metadata = Base.metadata
 
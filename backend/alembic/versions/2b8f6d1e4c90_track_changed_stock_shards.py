@@ -0,0 +1,58 @@
+"""track changed stock shards
+
+Revision ID: 2b8f6d1e4c90
+Revises: 7e2c4b9a1d53
+Create Date: 2026-10-19 11:03:18.552907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2b8f6d1e4c90'
+down_revision: Union[str, Sequence[str], None] = '7e2c4b9a1d53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('item_stock_shards', sa.Column('dirty', sa.Boolean(), nullable=False, server_default=sa.text('false')))
+    # Alleen de shards die de sweeper nog moet verwerken
+    op.create_index(
+        'ix_item_stock_shards_dirty',
+        'item_stock_shards',
+        ['item_id'],
+        unique=False,
+        postgresql_where=sa.text('dirty'),
+    )
+
+    # Elke voorraadwijziging markeert de shard, wie hem ook doet (reserveren,
+    # vrijgeven, bestellen, annuleren); de sweeper telt alleen die items op
+    op.execute("""
+        CREATE FUNCTION item_stock_shards_mark_dirty() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.dirty := true;
+            RETURN NEW;
+        END
+        $$
+    """)
+    op.execute("""
+        CREATE TRIGGER item_stock_shards_mark_dirty
+        BEFORE UPDATE ON item_stock_shards
+        FOR EACH ROW
+        WHEN (OLD.stock IS DISTINCT FROM NEW.stock)
+        EXECUTE FUNCTION item_stock_shards_mark_dirty()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP TRIGGER item_stock_shards_mark_dirty ON item_stock_shards')
+    op.execute('DROP FUNCTION item_stock_shards_mark_dirty()')
+    op.drop_index('ix_item_stock_shards_dirty', table_name='item_stock_shards')
+    op.drop_column('item_stock_shards', 'dirty')
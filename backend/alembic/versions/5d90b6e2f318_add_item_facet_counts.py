@@ -0,0 +1,106 @@
+"""add item facet counts
+
+Revision ID: 5d90b6e2f318
+Revises: c41e7a93b5d2
+Create Date: 2026-10-17 11:26:05.902663
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d90b6e2f318'
+down_revision: Union[str, Sequence[str], None] = 'c41e7a93b5d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('item_facet_counts',
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('price_bucket', sa.Integer(), nullable=False),
+    sa.Column('in_stock', sa.Boolean(), nullable=False),
+    sa.Column('item_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('category', 'price_bucket', 'in_stock')
+    )
+
+    # Prijsbanden moeten gelijk blijven aan PRICE_BUCKET_EDGES in models/items.py
+    op.execute("""
+        CREATE FUNCTION item_price_bucket(price double precision) RETURNS integer
+        LANGUAGE sql IMMUTABLE AS $$
+            SELECT width_bucket(price, ARRAY[5, 10, 25, 50, 100, 250]::double precision[])
+        $$
+    """)
+
+    op.execute("""
+        CREATE FUNCTION item_facet_counts_apply(
+            p_category text, p_price double precision, p_stock integer,
+            p_is_active boolean, p_delta integer
+        ) RETURNS void LANGUAGE plpgsql AS $$
+        BEGIN
+            IF NOT p_is_active THEN
+                RETURN;
+            END IF;
+            INSERT INTO item_facet_counts (category, price_bucket, in_stock, item_count)
+            VALUES (coalesce(p_category, ''), item_price_bucket(p_price), p_stock > 0, p_delta)
+            ON CONFLICT (category, price_bucket, in_stock)
+            DO UPDATE SET item_count = item_facet_counts.item_count + EXCLUDED.item_count;
+        END
+        $$
+    """)
+
+    op.execute("""
+        CREATE FUNCTION items_facet_counts_trigger() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                PERFORM item_facet_counts_apply(OLD.category, OLD.price, OLD.stock, OLD.is_active, -1);
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                PERFORM item_facet_counts_apply(NEW.category, NEW.price, NEW.stock, NEW.is_active, 1);
+            END IF;
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute("""
+        CREATE TRIGGER items_facet_counts_insert_delete
+        AFTER INSERT OR DELETE ON items
+        FOR EACH ROW EXECUTE FUNCTION items_facet_counts_trigger()
+    """)
+    # Updates die geen facet kolom raken hoeven niets te doen
+    op.execute("""
+        CREATE TRIGGER items_facet_counts_update
+        AFTER UPDATE ON items
+        FOR EACH ROW
+        WHEN (
+            OLD.category IS DISTINCT FROM NEW.category
+            OR item_price_bucket(OLD.price) IS DISTINCT FROM item_price_bucket(NEW.price)
+            OR (OLD.stock > 0) IS DISTINCT FROM (NEW.stock > 0)
+            OR OLD.is_active IS DISTINCT FROM NEW.is_active
+        )
+        EXECUTE FUNCTION items_facet_counts_trigger()
+    """)
+
+    # Vul de tabel met de huidige catalogus
+    op.execute("""
+        INSERT INTO item_facet_counts (category, price_bucket, in_stock, item_count)
+        SELECT coalesce(category, ''), item_price_bucket(price), stock > 0, count(*)
+        FROM items
+        WHERE is_active
+        GROUP BY 1, 2, 3
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP TRIGGER items_facet_counts_update ON items')
+    op.execute('DROP TRIGGER items_facet_counts_insert_delete ON items')
+    op.execute('DROP FUNCTION items_facet_counts_trigger()')
+    op.execute('DROP FUNCTION item_facet_counts_apply(text, double precision, integer, boolean, integer)')
+    op.execute('DROP FUNCTION item_price_bucket(double precision)')
+    op.drop_table('item_facet_counts')
@@ -0,0 +1,37 @@
+"""add sales rollup deltas
+
+Revision ID: 6c3e9a2f7b18
+Revises: 2b8f6d1e4c90
+Create Date: 2026-10-20 09:41:27.316054
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c3e9a2f7b18'
+down_revision: Union[str, Sequence[str], None] = '2b8f6d1e4c90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Alleen inserts vanuit de order transactie; de rollups zelf worden
+    # periodiek bijgewerkt, zodat checkouts niet op dezelfde dag rij wachten
+    op.create_table('sales_rollup_deltas',
+    sa.Column('id', sa.BigInteger(), sa.Identity(), nullable=False),
+    sa.Column('order_id', sa.UUID(), nullable=False),
+    sa.Column('order_created_at', sa.DateTime(), nullable=False),
+    sa.Column('sign', sa.SmallInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Openstaande deltas gaan verloren; daarna `python cli.py backfill-sales`
+    op.drop_table('sales_rollup_deltas')
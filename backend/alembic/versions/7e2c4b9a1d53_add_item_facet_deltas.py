@@ -0,0 +1,77 @@
+"""add item facet deltas
+
+Revision ID: 7e2c4b9a1d53
+Revises: f4b19c7e2a68
+Create Date: 2026-10-19 09:12:44.810263
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e2c4b9a1d53'
+down_revision: Union[str, Sequence[str], None] = 'f4b19c7e2a68'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Alleen inserts, geen unieke sleutel: gelijktijdige item writes wachten
+    # zo niet meer op dezelfde item_facet_counts rij
+    op.create_table('item_facet_deltas',
+    sa.Column('id', sa.BigInteger(), sa.Identity(), nullable=False),
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('price_bucket', sa.Integer(), nullable=False),
+    sa.Column('in_stock', sa.Boolean(), nullable=False),
+    sa.Column('delta', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION item_facet_counts_apply(
+            p_category text, p_price double precision, p_stock integer,
+            p_is_active boolean, p_delta integer
+        ) RETURNS void LANGUAGE plpgsql AS $$
+        BEGIN
+            IF NOT p_is_active THEN
+                RETURN;
+            END IF;
+            INSERT INTO item_facet_deltas (category, price_bucket, in_stock, delta)
+            VALUES (coalesce(p_category, ''), item_price_bucket(p_price), p_stock > 0, p_delta);
+        END
+        $$
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("""
+        CREATE OR REPLACE FUNCTION item_facet_counts_apply(
+            p_category text, p_price double precision, p_stock integer,
+            p_is_active boolean, p_delta integer
+        ) RETURNS void LANGUAGE plpgsql AS $$
+        BEGIN
+            IF NOT p_is_active THEN
+                RETURN;
+            END IF;
+            INSERT INTO item_facet_counts (category, price_bucket, in_stock, item_count)
+            VALUES (coalesce(p_category, ''), item_price_bucket(p_price), p_stock > 0, p_delta)
+            ON CONFLICT (category, price_bucket, in_stock)
+            DO UPDATE SET item_count = item_facet_counts.item_count + EXCLUDED.item_count;
+        END
+        $$
+    """)
+    # Openstaande deltas nog verwerken voordat de tabel weg gaat
+    op.execute("""
+        INSERT INTO item_facet_counts (category, price_bucket, in_stock, item_count)
+        SELECT category, price_bucket, in_stock, sum(delta)
+        FROM item_facet_deltas
+        GROUP BY 1, 2, 3
+        ON CONFLICT (category, price_bucket, in_stock)
+        DO UPDATE SET item_count = item_facet_counts.item_count + EXCLUDED.item_count
+    """)
+    op.drop_table('item_facet_deltas')
@@ -0,0 +1,35 @@
+"""add keyset index to items
+
+Revision ID: 8b2f4c1d9e07
+Revises: 273c63689c14
+Create Date: 2026-10-17 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2f4c1d9e07'
+down_revision: Union[str, Sequence[str], None] = '273c63689c14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Partiele index: alleen actieve items worden gepagineerd
+    op.create_index(
+        'ix_items_active_created_at_id',
+        'items',
+        ['created_at', 'id'],
+        unique=False,
+        postgresql_where=sa.text('is_active'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_items_active_created_at_id', table_name='items')
@@ -0,0 +1,170 @@
+"""partition orders by month
+
+Revision ID: b3d8e1f5c729
+Revises: 9f17d2c4a865
+Create Date: 2026-10-17 16:40:12.087533
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d8e1f5c729'
+down_revision: Union[str, Sequence[str], None] = '9f17d2c4a865'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+ORDER_COLUMNS = """
+    id uuid NOT NULL DEFAULT gen_random_uuid(),
+    user_id uuid NOT NULL,
+    status varchar NOT NULL,
+    total_amount double precision NOT NULL,
+    street varchar NOT NULL,
+    house_number varchar NOT NULL,
+    postal_code varchar NOT NULL,
+    city varchar NOT NULL,
+    country varchar NOT NULL,
+    created_at timestamp NOT NULL,
+    updated_at timestamp,
+    PRIMARY KEY (id, created_at)
+"""
+
+ORDER_ITEM_COLUMNS = """
+    id uuid NOT NULL DEFAULT gen_random_uuid(),
+    order_id uuid NOT NULL,
+    order_created_at timestamp NOT NULL,
+    item_id uuid,
+    product_name varchar NOT NULL,
+    product_price double precision NOT NULL,
+    quantity integer NOT NULL,
+    PRIMARY KEY (id, order_created_at)
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nieuwe gepartitioneerde tabellen naast de oude
+    op.execute(f"CREATE TABLE orders_new ({ORDER_COLUMNS}) PARTITION BY RANGE (created_at)")
+    op.execute(f"CREATE TABLE order_items_new ({ORDER_ITEM_COLUMNS}) PARTITION BY RANGE (order_created_at)")
+    op.execute("CREATE TABLE orders_default PARTITION OF orders_new DEFAULT")
+    op.execute("CREATE TABLE order_items_default PARTITION OF order_items_new DEFAULT")
+
+    # Maakt de partities voor een maand aan (ook gebruikt door cli.py create-partitions)
+    op.execute("""
+        CREATE FUNCTION create_order_partitions(p_month date, p_orders regclass, p_items regclass)
+        RETURNS void LANGUAGE plpgsql AS $$
+        DECLARE
+            m date := date_trunc('month', p_month);
+            suffix text := to_char(m, 'YYYY_MM');
+        BEGIN
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS %I PARTITION OF %s FOR VALUES FROM (%L) TO (%L)',
+                'orders_' || suffix, p_orders, m, m + interval '1 month'
+            );
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS %I PARTITION OF %s FOR VALUES FROM (%L) TO (%L)',
+                'order_items_' || suffix, p_items, m, m + interval '1 month'
+            );
+        END
+        $$
+    """)
+    op.execute("""
+        SELECT create_order_partitions(m::date, 'orders_new', 'order_items_new')
+        FROM generate_series(
+            date_trunc('month', coalesce((SELECT min(created_at) FROM orders), now())),
+            date_trunc('month', now()) + interval '3 months',
+            interval '1 month'
+        ) AS m
+    """)
+
+    # Data overzetten
+    op.execute("""
+        INSERT INTO orders_new (id, user_id, status, total_amount, street, house_number,
+                                postal_code, city, country, created_at, updated_at)
+        SELECT id, user_id, status, total_amount, street, house_number,
+               postal_code, city, country, created_at, updated_at
+        FROM orders
+    """)
+    op.execute("""
+        INSERT INTO order_items_new (id, order_id, order_created_at, item_id,
+                                     product_name, product_price, quantity)
+        SELECT oi.id, oi.order_id, o.created_at, oi.item_id,
+               oi.product_name, oi.product_price, oi.quantity
+        FROM order_items oi
+        JOIN orders o ON o.id = oi.order_id
+    """)
+
+    op.drop_table('order_items')
+    op.drop_table('orders')
+    op.execute("ALTER TABLE orders_new RENAME TO orders")
+    op.execute("ALTER TABLE order_items_new RENAME TO order_items")
+    op.execute("ALTER TABLE orders RENAME CONSTRAINT orders_new_pkey TO orders_pkey")
+    op.execute("ALTER TABLE order_items RENAME CONSTRAINT order_items_new_pkey TO order_items_pkey")
+
+    op.create_foreign_key(None, 'orders', 'users', ['user_id'], ['id'], ondelete='CASCADE')
+    op.create_foreign_key(
+        'order_items_order_fkey', 'order_items', 'orders',
+        ['order_id', 'order_created_at'], ['id', 'created_at'], ondelete='CASCADE',
+    )
+    op.create_foreign_key(None, 'order_items', 'items', ['item_id'], ['id'], ondelete='SET NULL')
+    op.create_index(op.f('ix_orders_user_id'), 'orders', ['user_id'], unique=False)
+    op.create_index(
+        'ix_orders_user_id_created_at_id',
+        'orders',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+    op.create_index(op.f('ix_order_items_order_id'), 'order_items', ['order_id'], unique=False)
+    op.create_index(op.f('ix_order_items_item_id'), 'order_items', ['item_id'], unique=False)
+
+    # Archief: losgekoppelde maanden worden hier aan gekoppeld (cli.py archive-orders)
+    op.execute(f"CREATE TABLE orders_archive ({ORDER_COLUMNS}) PARTITION BY RANGE (created_at)")
+    op.execute(f"CREATE TABLE order_items_archive ({ORDER_ITEM_COLUMNS}) PARTITION BY RANGE (order_created_at)")
+    op.create_index(
+        'ix_orders_archive_user_id_created_at_id',
+        'orders_archive',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+    op.create_index(
+        op.f('ix_order_items_archive_order_id'), 'order_items_archive', ['order_id'], unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Terug naar gewone tabellen, inclusief gearchiveerde orders
+    op.execute("""
+        CREATE TABLE orders_old AS
+        SELECT * FROM orders UNION ALL SELECT * FROM orders_archive
+    """)
+    op.execute("""
+        CREATE TABLE order_items_old AS
+        SELECT * FROM order_items UNION ALL SELECT * FROM order_items_archive
+    """)
+    op.execute("DROP TABLE order_items_archive, orders_archive, order_items, orders CASCADE")
+    op.execute("DROP FUNCTION create_order_partitions(date, regclass, regclass)")
+
+    op.execute("ALTER TABLE orders_old RENAME TO orders")
+    op.execute("ALTER TABLE order_items_old RENAME TO order_items")
+    op.drop_column('order_items', 'order_created_at')
+    op.execute("ALTER TABLE orders ALTER COLUMN id SET DEFAULT gen_random_uuid()")
+    op.execute("ALTER TABLE order_items ALTER COLUMN id SET DEFAULT gen_random_uuid()")
+    op.create_primary_key('orders_pkey', 'orders', ['id'])
+    op.create_primary_key('order_items_pkey', 'order_items', ['id'])
+    op.create_foreign_key(None, 'orders', 'users', ['user_id'], ['id'], ondelete='CASCADE')
+    op.create_foreign_key(None, 'order_items', 'orders', ['order_id'], ['id'], ondelete='CASCADE')
+    op.create_foreign_key(None, 'order_items', 'items', ['item_id'], ['id'], ondelete='SET NULL')
+    op.create_index(op.f('ix_orders_user_id'), 'orders', ['user_id'], unique=False)
+    op.create_index(
+        'ix_orders_user_id_created_at_id',
+        'orders',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+    op.create_index(op.f('ix_order_items_order_id'), 'order_items', ['order_id'], unique=False)
+    op.create_index(op.f('ix_order_items_item_id'), 'order_items', ['item_id'], unique=False)
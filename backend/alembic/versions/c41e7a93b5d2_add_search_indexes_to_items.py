@@ -0,0 +1,57 @@
+"""add search indexes to items
+
+Revision ID: c41e7a93b5d2
+Revises: 8b2f4c1d9e07
+Create Date: 2026-10-17 10:03:27.540118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41e7a93b5d2'
+down_revision: Union[str, Sequence[str], None] = '8b2f4c1d9e07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # Gegenereerde kolom, wordt door Postgres zelf bijgehouden bij elke write
+    op.add_column('items', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(description, ''))",
+            persisted=True,
+        ),
+        nullable=True,
+    ))
+    op.create_index(
+        'ix_items_search_vector',
+        'items',
+        ['search_vector'],
+        unique=False,
+        postgresql_using='gin',
+    )
+    op.create_index(
+        'ix_items_name_trgm',
+        'items',
+        ['name'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'name': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_items_name_trgm', table_name='items')
+    op.drop_index('ix_items_search_vector', table_name='items')
+    op.drop_column('items', 'search_vector')
@@ -0,0 +1,51 @@
+"""notify order status changes
+
+Revision ID: d72c5a0e9b13
+Revises: b3d8e1f5c729
+Create Date: 2026-10-17 18:05:33.471902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd72c5a0e9b13'
+down_revision: Union[str, Sequence[str], None] = 'b3d8e1f5c729'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Publiceert elke statuswijziging op kanaal order_status (utils/order_events.py)
+    op.execute("""
+        CREATE FUNCTION orders_notify_status() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM pg_notify('order_status', json_build_object(
+                'order_id', NEW.id,
+                'user_id', NEW.user_id,
+                'status', NEW.status,
+                'previous_status', OLD.status,
+                'updated_at', NEW.updated_at
+            )::text);
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute("""
+        CREATE TRIGGER orders_notify_status
+        AFTER UPDATE OF status ON orders
+        FOR EACH ROW
+        WHEN (OLD.status IS DISTINCT FROM NEW.status)
+        EXECUTE FUNCTION orders_notify_status()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP TRIGGER orders_notify_status ON orders')
+    op.execute('DROP FUNCTION orders_notify_status()')
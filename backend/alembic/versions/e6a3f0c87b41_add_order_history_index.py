@@ -0,0 +1,33 @@
+"""add order history index
+
+Revision ID: e6a3f0c87b41
+Revises: 5d90b6e2f318
+Create Date: 2026-10-17 13:48:19.204377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6a3f0c87b41'
+down_revision: Union[str, Sequence[str], None] = '5d90b6e2f318'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_orders_user_id_created_at_id',
+        'orders',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_orders_user_id_created_at_id', table_name='orders')
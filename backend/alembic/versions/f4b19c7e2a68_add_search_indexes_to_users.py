@@ -0,0 +1,43 @@
+"""add search indexes to users
+
+Revision ID: f4b19c7e2a68
+Revises: a58c9e2d7f40
+Create Date: 2026-10-18 11:42:08.306517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4b19c7e2a68'
+down_revision: Union[str, Sequence[str], None] = 'a58c9e2d7f40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # Prefix zoeken (LIKE 'abc%') op email en namen, hoofdletterongevoelig
+    op.execute('CREATE INDEX ix_users_email_prefix ON users (lower(email) text_pattern_ops)')
+    op.execute('CREATE INDEX ix_users_first_name_prefix ON users (lower(first_name) text_pattern_ops)')
+    op.execute('CREATE INDEX ix_users_last_name_prefix ON users (lower(last_name) text_pattern_ops)')
+
+    # Substring zoeken (LIKE '%abc%') over email en volledige naam samen;
+    # de expressie moet gelijk zijn aan USER_SEARCH_TEXT in api/user.py
+    op.execute("""
+        CREATE INDEX ix_users_search_trgm ON users
+        USING gin (lower(email || ' ' || coalesce(first_name, '') || ' ' || coalesce(last_name, '')) gin_trgm_ops)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_search_trgm', table_name='users')
+    op.drop_index('ix_users_last_name_prefix', table_name='users')
+    op.drop_index('ix_users_first_name_prefix', table_name='users')
+    op.drop_index('ix_users_email_prefix', table_name='users')
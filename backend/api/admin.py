@@ -1,22 +1,28 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from uuid import UUID
 
-from database import get_db
+from database import ReleasingRoute, async_engine, engine, get_async_db, get_db, replica_router
 from models.user import User
 from schemas.user import UserResponse
-from utils.auth import hash_password
+from utils.auth import AuthUser, hash_password_async, get_admin_user, invalidate_user
+from utils.db_pool import pool_status
+from utils.passwords import password_hasher
+from utils.users import USER_COLUMNS, USER_FIELDS
 
-router = APIRouter(prefix="/admin", tags=["admin"])
+router = APIRouter(prefix="/admin", tags=["admin"], route_class=ReleasingRoute)
 
 
 # Maak admin user aan (alleen via backend/command line)
 @router.post("/create-admin", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def create_admin(
+async def create_admin(
     email: str,
     password: str,
     secret_key: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Beveilig met een secret key
     import os
@@ -26,27 +32,27 @@ def create_admin(
             detail="Ongeldige secret key"
         )
     
-    # Check of email al bestaat
-    existing_user = db.query(User).filter(User.email == email).first()
-    if existing_user:
+    # Maak admin user aan; ON CONFLICT vervangt de aparte email check
+    row = (await db.execute(
+        pg_insert(User)
+        .values(
+            email=email,
+            hashed_password=await hash_password_async(password),
+            is_active=True,
+            is_admin=True,
+        )
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(*USER_COLUMNS)
+    )).first()
+    await db.commit()
+    
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email is al geregistreerd"
         )
     
-    # Maak admin user aan
-    admin_user = User(
-        email=email,
-        hashed_password=hash_password(password),
-        is_active=True,
-        is_admin=True
-    )
-    
-    db.add(admin_user)
-    db.commit()
-    db.refresh(admin_user)
-    
-    return admin_user
+    return dict(zip(USER_FIELDS, row))
 
 
 # Maak bestaande user admin (alleen via backend)
@@ -63,15 +69,39 @@ def make_user_admin(
             detail="Ongeldige secret key"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
+    row = db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(is_admin=True)
+        .returning(*USER_COLUMNS)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User niet gevonden"
         )
     
-    user.is_admin = True
     db.commit()
-    db.refresh(user)
+    invalidate_user(user_id)
     
-    return user
\ No newline at end of file
+    return dict(zip(USER_FIELDS, row))
+
+
+# Statistieken van de bcrypt pool (alleen admin)
+@router.get("/password-hashing/stats")
+def get_password_hashing_stats(admin: AuthUser = Depends(get_admin_user)):
+    return password_hasher.stats()
+
+
+# Bezetting en wachttijden van de database pools (alleen admin)
+@router.get("/db/pool")
+def get_db_pool_stats(admin: AuthUser = Depends(get_admin_user)):
+    return {
+        "sync": pool_status(engine),
+        "async": pool_status(async_engine.sync_engine),
+        "replicas": {
+            **replica_router.status(),
+            "pools": {replica.name: pool_status(replica.engine) for replica in replica_router.replicas},
+        },
+    }
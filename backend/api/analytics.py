@@ -0,0 +1,92 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import date
+
+from database import ReleasingRoute, get_async_db
+from models.analytics import SalesDaily, SalesItemDaily, SalesCategoryDaily, SalesCityDaily
+from schemas.analytics import DailyRevenue, ItemRevenue, CategoryRevenue, CityRevenue
+from utils.auth import AuthUser, get_admin_user
+
+router = APIRouter(prefix="/analytics", tags=["analytics"], route_class=ReleasingRoute)
+
+# Alle endpoints lezen de rollup tabellen (één rij per dag per dimensie),
+# nooit orders of order_items zelf.
+
+
+def _in_range(stmt, model, date_from: Optional[date], date_to: Optional[date]):
+    if date_from:
+        stmt = stmt.where(model.day >= date_from)
+    if date_to:
+        stmt = stmt.where(model.day <= date_to)
+    return stmt
+
+
+# GET - Omzet per dag (alleen admin)
+@router.get("/revenue/daily", response_model=List[DailyRevenue])
+async def get_daily_revenue(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_db),
+    admin: AuthUser = Depends(get_admin_user)
+):
+    stmt = _in_range(select(SalesDaily), SalesDaily, date_from, date_to)
+    return (await db.scalars(stmt.order_by(SalesDaily.day))).all()
+
+
+# GET - Omzet per item (alleen admin)
+@router.get("/revenue/items", response_model=List[ItemRevenue])
+async def get_item_revenue(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = Query(50, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db),
+    admin: AuthUser = Depends(get_admin_user)
+):
+    revenue = func.sum(SalesItemDaily.revenue)
+    stmt = select(
+        SalesItemDaily.item_id,
+        func.max(SalesItemDaily.product_name).label("product_name"),
+        func.sum(SalesItemDaily.units).label("units"),
+        revenue.label("revenue"),
+    )
+    stmt = _in_range(stmt, SalesItemDaily, date_from, date_to)
+    return (await db.execute(stmt.group_by(SalesItemDaily.item_id).order_by(revenue.desc()).limit(limit))).all()
+
+
+# GET - Omzet per categorie (alleen admin)
+@router.get("/revenue/categories", response_model=List[CategoryRevenue])
+async def get_category_revenue(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_db),
+    admin: AuthUser = Depends(get_admin_user)
+):
+    revenue = func.sum(SalesCategoryDaily.revenue)
+    stmt = select(
+        func.nullif(SalesCategoryDaily.category, "").label("category"),
+        func.sum(SalesCategoryDaily.units).label("units"),
+        revenue.label("revenue"),
+    )
+    stmt = _in_range(stmt, SalesCategoryDaily, date_from, date_to)
+    return (await db.execute(stmt.group_by(SalesCategoryDaily.category).order_by(revenue.desc()))).all()
+
+
+# GET - Omzet per stad (alleen admin)
+@router.get("/revenue/cities", response_model=List[CityRevenue])
+async def get_city_revenue(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = Query(50, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db),
+    admin: AuthUser = Depends(get_admin_user)
+):
+    revenue = func.sum(SalesCityDaily.revenue)
+    stmt = select(
+        SalesCityDaily.city,
+        func.sum(SalesCityDaily.orders).label("orders"),
+        revenue.label("revenue"),
+    )
+    stmt = _in_range(stmt, SalesCityDaily, date_from, date_to)
+    return (await db.execute(stmt.group_by(SalesCityDaily.city).order_by(revenue.desc()).limit(limit))).all()
@@ -1,34 +1,233 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Boolean, Float, Integer, cast, column, delete, func, or_, select, tuple_, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
+from typing import List, Optional, Union
 from uuid import UUID
+from datetime import datetime
 
-from database import get_db
-from models.items import Item
-from models.user import User
-from schemas.items import ItemCreate, ItemUpdate, ItemResponse
-from utils.auth import get_admin_user
+from database import ReleasingRoute, get_async_db, get_async_read_db, get_db
+from models.items import Item, PRICE_BUCKET_EDGES
+from schemas.items import (
+    ItemCreate, ItemUpdate, ItemResponse, ItemPage, ItemFacets,
+    ItemBulkUpdate, ItemBulkUpdateResult,
+)
+from utils.auth import AuthUser, get_admin_user
+from utils.bulk_items import import_items, export_items
+from utils.facets import facet_counts_stmt
+from utils.item_cache import KEYSET_PAGES, KEYSET_TAIL, OFFSET_PAGES, invalidate_item, item_cache
+from utils.pagination import encode_cursor, decode_cursor
+from utils.reservations import shard_item, unshard_item
+from utils.serialization import FAST_JSON, encode_page, respond, rows_to_dicts
 
-router = APIRouter(prefix="/items", tags=["items"])
+router = APIRouter(prefix="/items", tags=["items"], route_class=ReleasingRoute)
+
+BULK_BATCH_SIZE = 1000
+
+ITEM_FIELDS = list(ItemResponse.model_fields)
+ITEM_COLUMNS = [getattr(Item, field) for field in ITEM_FIELDS]
+
+
+def _serialize(item: Item) -> dict:
+    return ItemResponse.model_validate(item).model_dump()
+
+
+async def _load_items(db: AsyncSession, stmt) -> List[dict]:
+    """Voer een select(Item) uit en geef de items als dicts terug.
+
+    Met FAST_JSON worden alleen de response kolommen als platte rijen
+    opgehaald, zonder ORM objecten of een Pydantic model per rij.
+    """
+    if FAST_JSON:
+        result = await db.execute(stmt.with_only_columns(*ITEM_COLUMNS))
+        return rows_to_dicts(ITEM_FIELDS, result.all())
+    return [_serialize(item) for item in (await db.scalars(stmt)).all()]
+
+
+async def _load_keyset_page(db: AsyncSession, stmt, limit: int):
+    """Keyset pagina (geëncodeerd) plus de cache tags die erbij horen"""
+    items = await _load_items(db, stmt)
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1]["created_at"], items[-1]["id"])
+
+    tags = [KEYSET_PAGES] + [item["id"] for item in items]
+    if next_cursor is None:
+        tags.append(KEYSET_TAIL)
+    return encode_page({"items": items, "next_cursor": next_cursor}), tags
 
 
 # GET - Alle items ophalen (publiek)
-@router.get("/", response_model=List[ItemResponse])
-def get_all_items(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    items = db.query(Item).filter(Item.is_active == True).offset(skip).limit(limit).all()
-    return items
+# Zonder cursor: oude offset modus. Met cursor (leeg voor de eerste pagina):
+# keyset paginatie op (created_at, id) met een next_cursor in de response.
+# De publieke GET endpoints zijn async (asyncpg), bezetten geen thread en
+# lezen van een read replica als die er is.
+@router.get("/", response_model=Union[List[ItemResponse], ItemPage])
+async def get_all_items(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+    primary: AsyncSession = Depends(get_async_db)
+):
+    # primary pakt alleen een verbinding als we hem gebruiken: voor entries
+    # die net geïnvalideerd zijn en die een replica nog oud kan hebben
+    if cursor is None:
+        key = ("offset", skip, limit)
+        cached = item_cache.get(key)
+        if cached is not None:
+            return respond(cached)
+
+        if item_cache.recently_invalidated([OFFSET_PAGES]):
+            db = primary
+        stmt = select(Item).where(Item.is_active == True).offset(skip).limit(limit)
+        page = encode_page(await _load_items(db, stmt))
+        item_cache.set(key, page, tags=[OFFSET_PAGES])
+        return respond(page)
+
+    key = ("keyset", cursor, limit)
+    cached = item_cache.get(key)
+    if cached is not None:
+        return respond(cached)
+
+    stmt = select(Item).where(Item.is_active == True)
+    if cursor:
+        stmt = stmt.where(tuple_(Item.created_at, Item.id) > decode_cursor(cursor))
+    # Eentje extra ophalen om te weten of er nog een volgende pagina is
+    stmt = stmt.order_by(Item.created_at, Item.id).limit(limit + 1)
+
+    page, tags = await _load_keyset_page(db, stmt, limit)
+    # Welke items op de pagina staan weten we pas na het laden
+    if item_cache.recently_invalidated(tags):
+        page, tags = await _load_keyset_page(primary, stmt, limit)
+    item_cache.set(key, page, tags=tags)
+    return respond(page)
+
+
+# GET - Items zoeken op naam en beschrijving (publiek)
+# Full-text match via de tsvector GIN index, plus trigram word similarity op
+# naam zodat typfouten ("pikachuu") ook in langere namen ("Pikachu VMAX")
+# gevonden worden. name %> q vergelijkt q met het best passende deel van de
+# naam in plaats van met de hele naam, en kan de trigram index gebruiken.
+@router.get("/search", response_model=List[ItemResponse])
+async def search_items(
+    q: str = Query(..., min_length=1, max_length=100),
+    category: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    ts_query = func.websearch_to_tsquery("simple", q)
+    rank = func.greatest(
+        func.ts_rank(Item.search_vector, ts_query),
+        func.word_similarity(q, Item.name),
+    )
+
+    stmt = select(Item).where(
+        Item.is_active == True,
+        or_(Item.search_vector.op("@@")(ts_query), Item.name.op("%>")(q)),
+    )
+    if category == "":
+        # Zelfde betekenis als bij /facets: zonder categorie
+        stmt = stmt.where(Item.category.is_(None))
+    elif category:
+        stmt = stmt.where(Item.category == category)
+
+    return (await db.scalars(stmt.order_by(rank.desc(), Item.id).limit(limit))).all()
+
+
+# GET - Facets voor de productgrid (publiek)
+# Leest de door de trigger bijgehouden item_facet_counts tabel (hooguit
+# categorieen x prijsbanden x 2 rijen, plus openstaande deltas) in plaats
+# van GROUP BY over items. Elke facet telt met de andere filters mee, maar
+# niet met zijn eigen filter. category= (leeg) filtert op items zonder
+# categorie; die staan in de response met value null.
+@router.get("/facets", response_model=ItemFacets)
+async def get_item_facets(
+    category: Optional[str] = None,
+    price_bucket: Optional[int] = None,
+    in_stock: Optional[bool] = None,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    rows = (await db.execute(facet_counts_stmt())).all()
+
+    def matches(row, skip=None):
+        if skip != "category" and category is not None and row.category != category:
+            return False
+        if skip != "price_bucket" and price_bucket is not None and row.price_bucket != price_bucket:
+            return False
+        if skip != "in_stock" and in_stock is not None and row.in_stock != in_stock:
+            return False
+        return True
+
+    categories = {}
+    buckets = {}
+    total = 0
+    in_stock_count = 0
+    for row in rows:
+        if matches(row):
+            total += row.item_count
+        if matches(row, skip="in_stock") and row.in_stock:
+            in_stock_count += row.item_count
+        if matches(row, skip="category"):
+            categories[row.category] = categories.get(row.category, 0) + row.item_count
+        if matches(row, skip="price_bucket"):
+            buckets[row.price_bucket] = buckets.get(row.price_bucket, 0) + row.item_count
+
+    edges = [None] + PRICE_BUCKET_EDGES + [None]
+    return {
+        "total": total,
+        "in_stock": in_stock_count,
+        "categories": [
+            {"value": value or None, "count": count}
+            for value, count in sorted(categories.items(), key=lambda c: -c[1])
+        ],
+        "price_buckets": [
+            {
+                "bucket": bucket,
+                "min_price": edges[bucket],
+                "max_price": edges[bucket + 1],
+                "count": buckets.get(bucket, 0),
+            }
+            for bucket in range(len(PRICE_BUCKET_EDGES) + 1)
+        ],
+    }
+
+
+# GET - Cache statistieken (alleen admin)
+@router.get("/cache/stats")
+def get_cache_stats(admin: AuthUser = Depends(get_admin_user)):
+    return item_cache.stats()
 
 
 # GET - Specifiek item ophalen (publiek)
 @router.get("/{item_id}", response_model=ItemResponse)
-def get_item(item_id: UUID, db: Session = Depends(get_db)):
-    item = db.query(Item).filter(Item.id == item_id).first()
+async def get_item(
+    item_id: UUID,
+    db: AsyncSession = Depends(get_async_read_db),
+    primary: AsyncSession = Depends(get_async_db)
+):
+    key = ("item", item_id)
+    cached = item_cache.get(key)
+    if cached is not None:
+        return cached
+
+    # Net gewijzigd: een replica kan nog de oude versie hebben
+    if item_cache.recently_invalidated([item_id]):
+        db = primary
+    item = await db.get(Item, item_id)
     if not item:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Item niet gevonden"
         )
-    return item
+
+    data = _serialize(item)
+    item_cache.set(key, data, tags=[item_id])
+    return data
 
 
 # POST - Nieuw item aanmaken (alleen admin)
@@ -36,7 +235,7 @@ def get_item(item_id: UUID, db: Session = Depends(get_db)):
 def create_item(
     item_data: ItemCreate,
     db: Session = Depends(get_db),
-    admin: User = Depends(get_admin_user)
+    admin: AuthUser = Depends(get_admin_user)
 ):
     new_item = Item(
         name=item_data.name,
@@ -52,33 +251,148 @@ def create_item(
     db.commit()
     db.refresh(new_item)
     
+    # Nieuw item heeft de nieuwste created_at, dus raakt alleen de laatste keyset pagina
+    item_cache.invalidate_tag(OFFSET_PAGES)
+    item_cache.invalidate_tag(KEYSET_TAIL)
+    
     return new_item
 
 
+# PATCH - Prijs, voorraad en status van veel items tegelijk (alleen admin)
+# Een UPDATE ... FROM (VALUES ...) RETURNING per batch in plaats van een
+# SELECT + commit + refresh per item. Fouten worden per regel gerapporteerd.
+@router.patch("/bulk", response_model=ItemBulkUpdateResult)
+def bulk_update_items(
+    updates: List[ItemBulkUpdate],
+    db: Session = Depends(get_db),
+    admin: AuthUser = Depends(get_admin_user)
+):
+    errors = []
+    rows = {}
+    for row in updates:
+        if row.id in rows:
+            errors.append({"id": row.id, "detail": "Item komt dubbel voor"})
+        elif row.price is None and row.stock is None and row.is_active is None:
+            errors.append({"id": row.id, "detail": "Geen velden om bij te werken"})
+        elif row.price is not None and row.price < 0:
+            errors.append({"id": row.id, "detail": "Prijs mag niet negatief zijn"})
+        elif row.stock is not None and row.stock < 0:
+            errors.append({"id": row.id, "detail": "Voorraad mag niet negatief zijn"})
+        else:
+            rows[row.id] = row
+
+    # Voorraad van hot items staat in shards, niet in items.stock
+    with_stock = [item_id for item_id, row in rows.items() if row.stock is not None]
+    if with_stock:
+        hot = db.execute(
+            select(Item.id).where(Item.id.in_(with_stock), Item.is_hot == True)
+        ).scalars().all()
+        for item_id in hot:
+            errors.append({"id": item_id, "detail": "Voorraad van een hot item loopt via de shards"})
+            del rows[item_id]
+
+    pending = list(rows.values())
+    updated = []
+    for start in range(0, len(pending), BULK_BATCH_SIZE):
+        batch = pending[start:start + BULK_BATCH_SIZE]
+        deltas = values(
+            column("id", PG_UUID(as_uuid=True)),
+            column("price", Float),
+            column("stock", Integer),
+            column("is_active", Boolean),
+            name="deltas",
+        ).data([(row.id, row.price, row.stock, row.is_active) for row in batch])
+
+        # NULL in de VALUES betekent: kolom niet aanpassen
+        stmt = (
+            update(Item)
+            .where(Item.id == cast(deltas.c.id, PG_UUID(as_uuid=True)))
+            .values(
+                price=func.coalesce(cast(deltas.c.price, Float), Item.price),
+                stock=func.coalesce(cast(deltas.c.stock, Integer), Item.stock),
+                is_active=func.coalesce(cast(deltas.c.is_active, Boolean), Item.is_active),
+                updated_at=datetime.utcnow(),
+            )
+            .returning(Item.id)
+            .execution_options(synchronize_session=False)
+        )
+        updated.extend(db.execute(stmt).scalars().all())
+
+    db.commit()
+
+    found = set(updated)
+    for row in pending:
+        if row.id not in found:
+            errors.append({"id": row.id, "detail": "Item niet gevonden"})
+
+    activated = any(rows[item_id].is_active for item_id in found)
+    for item_id in found:
+        item_cache.invalidate_tag(item_id)
+    item_cache.invalidate_tag(OFFSET_PAGES)
+    if activated:
+        item_cache.invalidate_tag(KEYSET_PAGES)
+
+    return {"updated": updated, "errors": errors}
+
+
 # PUT - Item updaten (alleen admin)
 @router.put("/{item_id}", response_model=ItemResponse)
 def update_item(
     item_id: UUID,
     item_data: ItemUpdate,
     db: Session = Depends(get_db),
-    admin: User = Depends(get_admin_user)
+    admin: AuthUser = Depends(get_admin_user)
 ):
-    item = db.query(Item).filter(Item.id == item_id).first()
+    update_data = item_data.model_dump(exclude_unset=True)
+    if not update_data:
+        row = db.execute(select(*ITEM_COLUMNS).where(Item.id == item_id)).first()
+        if row is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Item niet gevonden"
+            )
+        return dict(zip(ITEM_FIELDS, row))
     
-    if not item:
+    # Eén UPDATE ... RETURNING; de oude waarden komen uit een subquery op
+    # dezelfde rij, zodat we weten of het item net actief is geworden
+    old_item = aliased(Item)
+    old = (
+        select(old_item.id, old_item.is_active.label("was_active"), old_item.is_hot.label("was_hot"))
+        .where(old_item.id == item_id)
+        .subquery()
+    )
+    stmt = (
+        update(Item)
+        .where(Item.id == old.c.id)
+        .values(**update_data)
+        .returning(*ITEM_COLUMNS, old.c.was_active)
+        .execution_options(synchronize_session=False)
+    )
+    if "stock" in update_data:
+        # Voorraad van hot items loopt via de shards
+        stmt = stmt.where(old.c.was_hot == False)
+    
+    row = db.execute(stmt).first()
+    if row is None:
+        # Alleen op het foutpad: 404 of hot item?
+        is_hot = db.execute(select(Item.is_hot).where(Item.id == item_id)).scalar()
+        db.rollback()
+        if is_hot is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Item niet gevonden"
+            )
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Item niet gevonden"
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Voorraad van een hot item loopt via de shards"
         )
     
-    update_data = item_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(item, field, value)
-    
     db.commit()
-    db.refresh(item)
     
-    return item
+    activated = update_data.get("is_active") is True and not row.was_active
+    invalidate_item(item_id, listing_changed=activated, stock_only=update_data.keys() == {"stock"})
+    
+    return dict(zip(ITEM_FIELDS, row))
 
 
 # DELETE - Item verwijderen (alleen admin)
@@ -86,17 +400,79 @@ def update_item(
 def delete_item(
     item_id: UUID,
     db: Session = Depends(get_db),
-    admin: User = Depends(get_admin_user)
+    admin: AuthUser = Depends(get_admin_user)
 ):
-    item = db.query(Item).filter(Item.id == item_id).first()
+    deleted = db.execute(
+        delete(Item)
+        .where(Item.id == item_id)
+        .returning(Item.id)
+        .execution_options(synchronize_session=False)
+    ).first()
     
-    if not item:
+    if deleted is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Item niet gevonden"
         )
     
-    db.delete(item)
     db.commit()
     
-    return None
\ No newline at end of file
+    invalidate_item(item_id)
+    
+    return None
+
+
+# POST - Item hot maken: voorraad verdelen over shards (alleen admin)
+# Voor limited releases: kopers reserveren via /reservations uit een
+# willekeurige shard, zodat ze niet allemaal op dezelfde rij wachten.
+@router.post("/{item_id}/hot")
+def make_item_hot(
+    item_id: UUID,
+    shards: int = Query(8, ge=1, le=256),
+    db: Session = Depends(get_db),
+    admin: AuthUser = Depends(get_admin_user)
+):
+    created = shard_item(db, item_id, shards)
+    invalidate_item(item_id)
+    return {"item_id": item_id, "shards": created}
+
+
+# DELETE - Hot item terugzetten naar gewone voorraad (alleen admin)
+@router.delete("/{item_id}/hot")
+def make_item_normal(
+    item_id: UUID,
+    db: Session = Depends(get_db),
+    admin: AuthUser = Depends(get_admin_user)
+):
+    stock = unshard_item(db, item_id)
+    invalidate_item(item_id)
+    return {"item_id": item_id, "stock": stock}
+
+
+# POST - Bulk import van items via CSV of NDJSON (alleen admin)
+# Upsert op naam via COPY, in plaats van een POST per item. Imports lopen na
+# elkaar (advisory lock), omdat de naam geen unieke sleutel is.
+@router.post("/bulk/import")
+def bulk_import_items(
+    file: UploadFile = File(...),
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    db: Session = Depends(get_db),
+    admin: AuthUser = Depends(get_admin_user)
+):
+    result = import_items(db, file.file, format)
+    item_cache.clear()
+    return result
+
+
+# GET - Streaming export van alle items (alleen admin)
+@router.get("/bulk/export")
+def bulk_export_items(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    admin: AuthUser = Depends(get_admin_user)
+):
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        export_items(format),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=items.{format}"},
+    )
@@ -1,86 +1,518 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from uuid import UUID
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Integer, cast, column, func, insert, select, tuple_, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional, Union
+from uuid import UUID, uuid4
+from concurrent.futures import TimeoutError as FutureTimeout
+from datetime import date, datetime
+import asyncio
+import json
+import os
 
-from database import get_db
-from models.orders import Order, OrderItem
-from models.user import User
-from schemas.orders import OrderCreate, OrderResponse
-from utils.auth import get_current_user
+from database import ReleasingRoute, SessionLocal, get_db, get_read_db
+from models.items import Item
+from models.orders import Order, OrderItem, ArchivedOrder, ArchivedOrderItem, ORDER_TRANSITIONS
+from schemas.orders import (
+    OrderCreate, OrderResponse, OrderItemResponse, OrderPage,
+    OrderStatusUpdate, OrderStatusUpdateResult,
+)
+from utils.auth import AuthUser, get_current_user, get_admin_user, user_from_token
+from utils.group_commit import GroupCommitQueue
+from utils.idempotency import IdempotencyStore
+from utils.item_cache import invalidate_item
+from utils.order_events import order_events
+from utils.order_export import export_orders
+from utils.pagination import encode_cursor, decode_cursor
+from utils.reservations import consume, restock
+from utils.sales_rollups import record_orders
+from utils.serialization import FAST_JSON, FastJSONResponse, rows_to_dicts, to_json
 
-router = APIRouter(prefix="/orders", tags=["orders"])
+router = APIRouter(prefix="/orders", tags=["orders"], route_class=ReleasingRoute)
+
+# Optioneel: orders via een queue verzamelen en per batch committen
+ORDER_GROUP_COMMIT = os.getenv("ORDER_GROUP_COMMIT", "false").lower() == "true"
+ORDER_GROUP_COMMIT_TIMEOUT = float(os.getenv("ORDER_GROUP_COMMIT_TIMEOUT", "10"))
+
+# Opgeslagen antwoorden van POST /orders per (user, Idempotency-Key)
+order_idempotency = IdempotencyStore(
+    maxsize=int(os.getenv("ORDER_IDEMPOTENCY_SIZE", "10000")),
+    ttl=float(os.getenv("ORDER_IDEMPOTENCY_TTL", "86400")),
+)
+
+ORDER_FIELDS = [field for field in OrderResponse.model_fields if field != "items"]
+ORDER_ITEM_FIELDS = list(OrderItemResponse.model_fields)
+
+
+def _order_dicts(db: Session, order_stmt, order_model=Order, item_model=OrderItem) -> List[dict]:
+    """Laad orders met hun regels als platte dicts (twee queries),
+    in hetzelfde formaat als OrderResponse. Werkt ook op de archief tabellen."""
+    order_columns = [getattr(order_model, field) for field in ORDER_FIELDS]
+    item_columns = [getattr(item_model, field) for field in ORDER_ITEM_FIELDS]
+
+    orders = rows_to_dicts(ORDER_FIELDS, db.execute(order_stmt.with_only_columns(*order_columns)))
+    by_id = {}
+    for order in orders:
+        order["items"] = []
+        by_id[order["id"]] = order
+
+    if by_id:
+        lines = db.execute(
+            select(item_model.order_id, *item_columns)
+            .where(item_model.order_id.in_(list(by_id)))
+        )
+        for order_id, *line in lines:
+            by_id[order_id]["items"].append(dict(zip(ORDER_ITEM_FIELDS, line)))
+
+    return orders
+
+
+def _history_stmt(model, user_id: UUID, cursor: Optional[str]):
+    stmt = select(model).where(model.user_id == user_id)
+    if cursor:
+        stmt = stmt.where(tuple_(model.created_at, model.id) < decode_cursor(cursor))
+    return stmt.order_by(model.created_at.desc(), model.id.desc())
+
+
+def _cursor_of(order) -> str:
+    if isinstance(order, dict):
+        return encode_cursor(order["created_at"], order["id"])
+    return encode_cursor(order.created_at, order.id)
 
 
 @router.post("/", response_model=OrderResponse)
 def create_order(
     order_data: OrderCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
 ):
-    """Maak een nieuwe bestelling aan"""
-    # Bereken totaal
-    total = sum(item.product_price * item.quantity for item in order_data.items)
-
-    # Maak order aan
-    db_order = Order(
-        user_id=current_user.id,
-        total_amount=total,
-        street=order_data.address.street,
-        house_number=order_data.address.house_number,
-        postal_code=order_data.address.postal_code,
-        city=order_data.address.city,
-        country=order_data.address.country,
-        status="pending",
+    """Maak een nieuwe bestelling aan
+
+    Met een Idempotency-Key header wordt een herhaalde request (bijv. een
+    retry na een timeout) niet opnieuw uitgevoerd, maar krijgt die het
+    antwoord van de eerste request terug.
+    """
+    if idempotency_key is None:
+        return _place_order(order_data, db, current_user)
+
+    order, replayed = order_idempotency.run(
+        (current_user.id, idempotency_key),
+        order_data.model_dump_json(),
+        lambda: _place_order(order_data, db, current_user),
     )
-    db.add(db_order)
-    db.flush()  # Om de order ID te krijgen
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return order
+
+
+def _place_order(order_data: OrderCreate, db: Session, current_user: AuthUser) -> dict:
+    """Plaats de bestelling in een korte transactie, of via de group commit
+    queue als ORDER_GROUP_COMMIT aan staat"""
+    quantities = _order_quantities(order_data)
+
+    if ORDER_GROUP_COMMIT:
+        future = order_queue.submit((order_data, current_user.id, quantities))
+        try:
+            return future.result(timeout=ORDER_GROUP_COMMIT_TIMEOUT)
+        except FutureTimeout:
+            # Nog in de queue: annuleren, dan is de order zeker niet geplaatst
+            if future.cancel():
+                raise HTTPException(
+                    status_code=503,
+                    detail="Bestelling niet geplaatst, het is te druk. Probeer het opnieuw.",
+                    headers={"Retry-After": "1"},
+                )
+        # De batch met deze order loopt al (één transactie): wacht op de
+        # uitkomst, anders weet de client niet of de order geplaatst is
+        return future.result()
 
-    # Voeg order items toe
+    try:
+        order, lines = _reserve_order(db, order_data, current_user.id, quantities)
+    except HTTPException:
+        db.rollback()
+        raise
+
+    db.execute(insert(Order), [order])
+    db.execute(insert(OrderItem), lines)
+    record_orders(db, [(order["id"], order["created_at"])])
+    db.commit()
+
+    # Voorraad is veranderd, dus cache entries van deze items weggooien
+    for item_id in quantities:
+        invalidate_item(item_id, stock_only=True)
+
+    return {**order, "items": lines}
+
+
+def _order_quantities(order_data: OrderCreate) -> dict:
+    """Valideer de regels en tel aantallen per item op (zelfde kaart kan
+    dubbel in de cart staan)"""
+    if not order_data.items:
+        raise HTTPException(status_code=400, detail="Bestelling bevat geen items")
+
+    quantities = {}
     for item in order_data.items:
-        db_item = OrderItem(
-            order_id=db_order.id,
-            item_id=UUID(item.item_id),
-            product_name=item.product_name,
-            product_price=item.product_price,
-            quantity=item.quantity,
+        try:
+            item_id = UUID(item.item_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Ongeldig item id")
+        if item.quantity < 1:
+            raise HTTPException(status_code=400, detail="Ongeldig aantal")
+        quantities[item_id] = quantities.get(item_id, 0) + item.quantity
+    return quantities
+
+
+def _lock_items(db: Session, item_ids) -> None:
+    """Lock de (niet-hot) item rijen in id volgorde, tot de commit.
+    Hot items lopen via hun shards en blijven ongelockt."""
+    db.execute(
+        select(Item.id)
+        .where(Item.id.in_(list(item_ids)), Item.is_hot == False)
+        .order_by(Item.id)
+        .with_for_update()
+    )
+
+
+def _reserve_order(db: Session, order_data: OrderCreate, user_id: UUID, quantities: dict):
+    """Boek voorraad af en bouw de order- en regelrijen
+
+    Prijzen en namen komen uit de database, niet van de client. De voorraad
+    wordt in een UPDATE ... WHERE stock >= aantal RETURNING afgeboekt, dus
+    gelijktijdige kopers van dezelfde kaart kunnen niet oververkopen. Bij
+    onvoldoende voorraad volgt een 409; de aanroeper moet dan terugdraaien.
+
+    Hot items (voorraad in shards) kunnen alleen besteld worden met een
+    reservering; die wordt hier omgezet in de verkoop.
+    """
+    # Hot items worden gedekt door eerder gemaakte reserveringen
+    covered = consume(db, user_id, quantities)
+    reserved = []
+    if covered:
+        reserved = db.execute(
+            select(Item.id, Item.name, Item.price)
+            .where(Item.id.in_(covered), Item.is_active == True)
+        ).all()
+
+    remaining = sorted((item_id, qty) for item_id, qty in quantities.items() if item_id not in covered)
+    if remaining:
+        # Eerst de item rijen locken in id volgorde: de UPDATE ... FROM VALUES
+        # hieronder lockt in de volgorde die de planner kiest, en twee orders
+        # met dezelfde items kunnen dan deadlocken
+        _lock_items(db, [item_id for item_id, _ in remaining])
+        wanted = values(
+            column("id", PG_UUID(as_uuid=True)),
+            column("quantity", Integer),
+            name="wanted",
+        ).data(remaining)
+
+        reserved += db.execute(
+            update(Item)
+            .where(
+                Item.id == cast(wanted.c.id, PG_UUID(as_uuid=True)),
+                Item.is_active == True,
+                Item.is_hot == False,
+                Item.stock >= wanted.c.quantity,
+            )
+            .values(stock=Item.stock - wanted.c.quantity)
+            .returning(Item.id, Item.name, Item.price)
+            .execution_options(synchronize_session=False)
+        ).all()
+
+    if len(reserved) < len(quantities):
+        missing = set(quantities) - {row.id for row in reserved}
+        names = sorted({
+            item.product_name or item.item_id
+            for item in order_data.items
+            if UUID(item.item_id) in missing
+        })
+        raise HTTPException(
+            status_code=409,
+            detail=f"Niet genoeg voorraad (of geen reservering) voor: {', '.join(names)}"
         )
-        db.add(db_item)
 
-    db.commit()
-    db.refresh(db_order)
+    order_id = uuid4()
+    created_at = datetime.utcnow()
+    lines = [
+        {
+            "id": uuid4(),
+            "order_id": order_id,
+            "order_created_at": created_at,
+            "item_id": row.id,
+            "product_name": row.name,
+            "product_price": row.price,
+            "quantity": quantities[row.id],
+        }
+        for row in reserved
+    ]
+    order = {
+        "id": order_id,
+        "user_id": user_id,
+        "status": "pending",
+        "total_amount": sum(line["product_price"] * line["quantity"] for line in lines),
+        "street": order_data.address.street,
+        "house_number": order_data.address.house_number,
+        "postal_code": order_data.address.postal_code,
+        "city": order_data.address.city,
+        "country": order_data.address.country,
+        "created_at": created_at,
+    }
+    return order, lines
+
+
+def _write_order_batch(batch) -> None:
+    """Group commit handler: alle orders uit de batch in één transactie
 
-    return db_order
+    Elke order boekt zijn voorraad af in een eigen savepoint, zodat een
+    oververkochte order alleen zichzelf laat mislukken. Daarna gaan alle
+    orders en regels in twee multi-row inserts en één commit.
+    """
+    db = SessionLocal()
+    try:
+        # Alle items van de batch in één keer en in id volgorde locken, buiten
+        # de savepoints: anders lockt elke order zijn eigen items en kunnen
+        # twee batches met overlappende items elkaar alsnog deadlocken
+        _lock_items(db, {item_id for (_, _, quantities), _ in batch for item_id in quantities})
+        accepted = []
+        for (order_data, user_id, quantities), future in batch:
+            try:
+                with db.begin_nested():
+                    order, lines = _reserve_order(db, order_data, user_id, quantities)
+            except HTTPException as e:
+                future.set_exception(e)
+                continue
+            accepted.append((order, lines, quantities, future))
 
+        if not accepted:
+            db.rollback()
+            return
 
-@router.get("/", response_model=List[OrderResponse])
+        db.execute(insert(Order), [order for order, _, _, _ in accepted])
+        db.execute(insert(OrderItem), [line for _, lines, _, _ in accepted for line in lines])
+        record_orders(db, [(order["id"], order["created_at"]) for order, _, _, _ in accepted])
+        db.commit()
+    finally:
+        db.close()
+
+    for order, lines, quantities, future in accepted:
+        for item_id in quantities:
+            invalidate_item(item_id, stock_only=True)
+        future.set_result({**order, "items": lines})
+
+
+order_queue = GroupCommitQueue(
+    _write_order_batch,
+    max_batch=int(os.getenv("ORDER_GROUP_COMMIT_BATCH", "100")),
+    max_wait=float(os.getenv("ORDER_GROUP_COMMIT_WAIT_MS", "5")) / 1000,
+)
+
+
+@router.get("/", response_model=Union[List[OrderResponse], OrderPage])
 def get_my_orders(
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+    current_user: AuthUser = Depends(get_current_user),
+):
+    """Haal de bestellingen van de ingelogde gebruiker op, nieuwste eerst
+
+    Zonder cursor komen alle bestellingen terug. Met cursor (leeg voor de
+    eerste pagina) wordt er gepagineerd op (created_at, id) en komt er een
+    next_cursor mee. Orderregels worden altijd in een vast aantal queries
+    geladen, hoeveel orders het ook zijn. Leest van een replica, behalve
+    vlak na een eigen bestelling.
+    """
+    stmt = _history_stmt(Order, current_user.id, cursor)
+    if cursor is not None:
+        # Eentje extra ophalen om te weten of er nog een volgende pagina is
+        stmt = stmt.limit(limit + 1)
+
+    if FAST_JSON:
+        orders = _order_dicts(db, stmt)
+    else:
+        orders = db.scalars(stmt.options(selectinload(Order.items))).all()
+
+    # Gearchiveerde maanden zijn altijd ouder dan de hete data, dus die
+    # komen pas aan de beurt als de hete orders op zijn
+    if cursor is None or len(orders) <= limit:
+        archive_stmt = _history_stmt(ArchivedOrder, current_user.id, cursor)
+        if cursor is not None:
+            archive_stmt = archive_stmt.limit(limit + 1 - len(orders))
+        orders = list(orders) + _order_dicts(db, archive_stmt, ArchivedOrder, ArchivedOrderItem)
+
+    if cursor is None:
+        return FastJSONResponse(to_json(orders)) if FAST_JSON else orders
+
+    next_cursor = None
+    if len(orders) > limit:
+        orders = orders[:limit]
+        next_cursor = _cursor_of(orders[-1])
+
+    page = {"orders": orders, "next_cursor": next_cursor}
+    return FastJSONResponse(to_json(page)) if FAST_JSON else page
+
+
+@router.patch("/status", response_model=OrderStatusUpdateResult)
+def update_order_status(
+    update_data: OrderStatusUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    admin: AuthUser = Depends(get_admin_user),
 ):
-    """Haal alle bestellingen van de ingelogde gebruiker op"""
-    orders = (
-        db.query(Order)
-        .filter(Order.user_id == current_user.id)
-        .order_by(Order.created_at.desc())
-        .all()
+    """Zet de status van veel orders tegelijk (alleen admin)
+
+    Eén UPDATE voor alle orders; de WHERE op de huidige status bewaakt de
+    toegestane overgangen, ook als twee admins tegelijk bezig zijn. Bij
+    annuleren gaat de voorraad terug naar de items (of hun shards).
+    """
+    allowed_from = [
+        current for current, targets in ORDER_TRANSITIONS.items()
+        if update_data.status in targets
+    ]
+    order_ids = list(dict.fromkeys(update_data.order_ids))
+
+    updated_rows = db.execute(
+        update(Order)
+        .where(Order.id.in_(order_ids), Order.status.in_(allowed_from))
+        .values(status=update_data.status, updated_at=datetime.utcnow())
+        .returning(Order.id, Order.created_at)
+        .execution_options(synchronize_session=False)
+    ).all()
+    updated = [row.id for row in updated_rows]
+
+    restocked = []
+    if update_data.status == "cancelled" and updated:
+        returned = (
+            select(OrderItem.item_id, func.sum(OrderItem.quantity).label("quantity"))
+            .where(OrderItem.order_id.in_(updated), OrderItem.item_id.is_not(None))
+            .group_by(OrderItem.item_id)
+            .subquery()
+        )
+        # Eerst de item rijen locken in id volgorde, net als bij het bestellen,
+        # zodat een annulering en een checkout niet op elkaar deadlocken
+        db.execute(
+            select(Item.id)
+            .where(Item.id.in_(select(returned.c.item_id)))
+            .order_by(Item.id)
+            .with_for_update()
+        )
+        restocked = db.execute(
+            update(Item)
+            .where(Item.id == returned.c.item_id, Item.is_hot == False)
+            .values(stock=Item.stock + returned.c.quantity)
+            .returning(Item.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        # Hot items: verdeeld over hun shards, de sweeper werkt items.stock bij
+        hot_returned = db.execute(
+            select(returned.c.item_id, returned.c.quantity)
+            .join(Item, Item.id == returned.c.item_id)
+            .where(Item.is_hot == True)
+        ).all()
+        restock(db, dict(hot_returned))
+
+    if update_data.status == "cancelled":
+        record_orders(db, updated_rows, sign=-1)
+    db.commit()
+
+    for item_id in restocked:
+        invalidate_item(item_id, stock_only=True)
+
+    found = set(updated)
+    errors = [
+        {"id": order_id, "detail": f"Overgang naar {update_data.status} niet toegestaan of order niet gevonden"}
+        for order_id in order_ids if order_id not in found
+    ]
+    return {"updated": updated, "errors": errors}
+
+
+@router.get("/export")
+def export_orders_stream(
+    format: str = Query("ndjson", pattern="^(csv|ndjson)$"),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    status: Optional[str] = None,
+    admin: AuthUser = Depends(get_admin_user),
+):
+    """Stream alle orders met regels en adressen als NDJSON of CSV (alleen admin)
+
+    Geheugengebruik blijft gelijk, hoe groot de export ook is.
+    """
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        export_orders(format, date_from, date_to, status),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=orders.{format}"},
+    )
+
+
+@router.get("/events")
+async def order_events_stream(
+    token: str = Query(...),
+):
+    """Server-Sent Events stream met statuswijzigingen van je orders
+
+    EventSource kan geen Authorization header meesturen, daarom gaat de
+    token als query parameter mee. Admins krijgen wijzigingen van alle orders.
+    """
+    # De lookup geeft zijn verbinding meteen terug; de stream zelf heeft
+    # geen database nodig
+    user = await run_in_threadpool(user_from_token, token)
+    user_id, is_admin = user.id, user.is_admin
+
+    queue = order_events.subscribe(user_id, is_admin)
+
+    async def stream():
+        try:
+            yield ": verbonden\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: order_status\ndata: {json.dumps(event)}\n\n"
+        finally:
+            order_events.unsubscribe(queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    return orders
 
 
 @router.get("/{order_id}", response_model=OrderResponse)
 def get_order(
     order_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
 ):
-    """Haal een specifieke bestelling op"""
-    order = db.query(Order).filter(Order.id == UUID(order_id)).first()
+    """Haal een specifieke bestelling op (ook uit het archief)"""
+    # Regels hier al laden: de sessie is dicht voordat de response
+    # geserialiseerd wordt (ReleasingRoute), lazy loading kan dan niet meer
+    order = db.scalars(
+        select(Order).where(Order.id == UUID(order_id)).options(selectinload(Order.items))
+    ).first()
+    if order:
+        owner = order.user_id
+    else:
+        owner = db.scalar(select(ArchivedOrder.user_id).where(ArchivedOrder.id == UUID(order_id)))
 
-    if not order:
+    if owner is None:
         raise HTTPException(status_code=404, detail="Bestelling niet gevonden")
 
-    if order.user_id != current_user.id and not current_user.is_admin:
+    if owner != current_user.id and not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Geen toegang tot deze bestelling")
 
+    if not order:
+        order = _order_dicts(
+            db,
+            select(ArchivedOrder).where(ArchivedOrder.id == UUID(order_id)),
+            ArchivedOrder,
+            ArchivedOrderItem,
+        )[0]
+
     return order
@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import List
+from uuid import UUID
+from datetime import datetime
+
+from database import ReleasingRoute, get_db
+from models.inventory import StockReservation
+from schemas.reservations import ReservationCreate, ReservationResponse
+from utils.auth import AuthUser, get_current_user
+from utils.reservations import reserve, release
+
+router = APIRouter(prefix="/reservations", tags=["reservations"], route_class=ReleasingRoute)
+
+# Reserveringen zijn alleen voor hot items (voorraad in shards). Een
+# reservering houdt voorraad vast tot de order geplaatst wordt of tot
+# RESERVATION_TTL verstrijkt; daarna zet de sweeper hem terug.
+
+
+# POST - Voorraad van een hot item reserveren
+@router.post("/", response_model=ReservationResponse, status_code=status.HTTP_201_CREATED)
+def create_reservation(
+    reservation_data: ReservationCreate,
+    db: Session = Depends(get_db),
+    current_user: AuthUser = Depends(get_current_user)
+):
+    if reservation_data.quantity < 1:
+        raise HTTPException(status_code=400, detail="Ongeldig aantal")
+    return reserve(db, current_user.id, reservation_data.item_id, reservation_data.quantity)
+
+
+# GET - Eigen open reserveringen ophalen
+@router.get("/", response_model=List[ReservationResponse])
+def get_my_reservations(
+    db: Session = Depends(get_db),
+    current_user: AuthUser = Depends(get_current_user)
+):
+    return db.query(StockReservation).filter(
+        StockReservation.user_id == current_user.id,
+        StockReservation.expires_at > datetime.utcnow()
+    ).order_by(StockReservation.expires_at).all()
+
+
+# DELETE - Reservering vrijgeven
+@router.delete("/{reservation_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_reservation(
+    reservation_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: AuthUser = Depends(get_current_user)
+):
+    release(db, current_user.id, reservation_id)
+    return None
@@ -1,50 +1,95 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import delete, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 from uuid import UUID
 
-from database import get_db
+from database import ReleasingRoute, get_async_db, get_db, get_read_db
 from models.user import User
-from schemas.user import UserCreate, UserUpdate, UserResponse, UserLogin, TokenResponse
-from utils.auth import hash_password, verify_password, create_access_token
+from schemas.user import UserCreate, UserUpdate, UserResponse, UserLogin, TokenResponse, UserSearchPage
+from utils.auth import (
+    hash_password_async, verify_password_async,
+    password_needs_rehash, create_access_token, invalidate_user,
+    AuthUser, get_admin_user,
+)
+from utils.pagination import encode_email_cursor, decode_email_cursor
+from utils.rate_limit import login_limiter
+from utils.serialization import FAST_JSON, FastJSONResponse, rows_to_dicts, to_json
+from utils.users import USER_COLUMNS, USER_FIELDS
 
-router = APIRouter(prefix="/users", tags=["users"])
+router = APIRouter(prefix="/users", tags=["users"], route_class=ReleasingRoute)
+
+# Moet gelijk zijn aan de expressie van de ix_users_search_trgm index
+USER_SEARCH_TEXT = "lower(email || ' ' || coalesce(first_name, '') || ' ' || coalesce(last_name, ''))"
+
+
+def _like_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _estimate_rows(db: Session, where: str, params: dict) -> int:
+    """Aantal rijen volgens de planner (EXPLAIN), zonder de tabel te tellen"""
+    if where == "true":
+        return int(db.execute(text(
+            "SELECT greatest(reltuples, 0)::bigint FROM pg_class WHERE oid = 'users'::regclass"
+        )).scalar() or 0)
+    plan = db.execute(text(f"EXPLAIN (FORMAT JSON) SELECT 1 FROM users WHERE {where}"), params).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
 
 
 # CREATE - Registreer nieuwe user
+# Async: bcrypt draait in de password pool en de database via asyncpg,
+# zodat er tijdens het hashen en de query geen thread bezet blijft.
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def create_user(user_data: UserCreate, db: Session = Depends(get_db)):
-    # Check of email al bestaat
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
-    if existing_user:
+async def create_user(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    # Bekende email: meteen een 400, zonder eerst een volledige bcrypt hash
+    if (await db.execute(select(User.id).where(User.email == user_data.email))).first():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email is al geregistreerd"
         )
     
-    # Maak nieuwe user aan
-    new_user = User(
-        email=user_data.email,
-        hashed_password=hash_password(user_data.password),
-        first_name=user_data.first_name,
-        last_name=user_data.last_name,
-        is_active=True
-    )
+    hashed_password = await hash_password_async(user_data.password)
     
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    # INSERT ... ON CONFLICT: twee gelijktijdige registraties met dezelfde
+    # email kunnen niet allebei slagen
+    row = (await db.execute(
+        pg_insert(User)
+        .values(
+            email=user_data.email,
+            hashed_password=hashed_password,
+            first_name=user_data.first_name,
+            last_name=user_data.last_name,
+            is_active=True,
+            is_admin=False,
+        )
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(*USER_COLUMNS)
+    )).first()
+    await db.commit()
+    
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email is al geregistreerd"
+        )
     
-    return new_user
+    return dict(zip(USER_FIELDS, row))
 
 
 # LOGIN - Authenticeer user
 @router.post("/login", response_model=TokenResponse)
-def login_user(login_data: UserLogin, db: Session = Depends(get_db)):
+async def login_user(login_data: UserLogin, request: Request, db: AsyncSession = Depends(get_async_db)):
+    # Eerst de rate limiter, zodat geblokkeerde pogingen geen query of hash kosten
+    await login_limiter.check_async(request, login_data.email)
+    
     # Zoek user op email
-    user = db.query(User).filter(User.email == login_data.email).first()
+    user = (await db.scalars(select(User).where(User.email == login_data.email))).first()
     
-    if not user or not verify_password(login_data.password, user.hashed_password):
+    if not user or not await verify_password_async(login_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Ongeldige email of wachtwoord"
@@ -56,6 +101,13 @@ def login_user(login_data: UserLogin, db: Session = Depends(get_db)):
             detail="Account is gedeactiveerd"
         )
     
+    await login_limiter.succeeded_async(login_data.email)
+    
+    # BCRYPT_ROUNDS veranderd: hash opnieuw nu we het wachtwoord kennen
+    if password_needs_rehash(user.hashed_password):
+        user.hashed_password = await hash_password_async(login_data.password)
+        await db.commit()
+    
     # Maak JWT token
     access_token = create_access_token(data={"sub": str(user.id), "email": user.email})
     
@@ -64,11 +116,66 @@ def login_user(login_data: UserLogin, db: Session = Depends(get_db)):
 
 # READ - Haal alle users op
 @router.get("/", response_model=List[UserResponse])
-def get_all_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def get_all_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_read_db)):
+    if FAST_JSON:
+        rows = db.execute(select(*USER_COLUMNS).offset(skip).limit(limit))
+        return FastJSONResponse(to_json(rows_to_dicts(USER_FIELDS, rows)))
+
     users = db.query(User).offset(skip).limit(limit).all()
     return users
 
 
+# GET - Users zoeken voor support (alleen admin)
+# Prefix match op email, voornaam en achternaam (text_pattern_ops indexes) of
+# substring match over email en volledige naam (trigram index). Keyset
+# paginatie op (email, id); het totaal is een planner schatting.
+@router.get("/search", response_model=UserSearchPage)
+def search_users(
+    q: str = Query("", max_length=100),
+    match: Literal["prefix", "substring"] = "prefix",
+    limit: int = Query(25, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    admin: AuthUser = Depends(get_admin_user)
+):
+    term = _like_escape(q.strip().lower())
+    params = {}
+    if not term:
+        where = "true"
+    elif match == "prefix":
+        where = "(lower(email) LIKE :pattern OR lower(first_name) LIKE :pattern OR lower(last_name) LIKE :pattern)"
+        params["pattern"] = term + "%"
+    else:
+        where = f"{USER_SEARCH_TEXT} LIKE :pattern"
+        params["pattern"] = "%" + term + "%"
+
+    estimated_total = _estimate_rows(db, where, params)
+
+    page_where = where
+    if cursor:
+        after_email, after_id = decode_email_cursor(cursor)
+        page_where += " AND (email, id) > (:after_email, :after_id)"
+        params.update(after_email=after_email, after_id=after_id)
+
+    rows = db.execute(
+        text(f"""
+            SELECT {", ".join(USER_FIELDS)} FROM users
+            WHERE {page_where}
+            ORDER BY email, id
+            LIMIT :limit
+        """),
+        {**params, "limit": limit + 1},
+    )
+    users = rows_to_dicts(USER_FIELDS, rows)
+
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_cursor = encode_email_cursor(users[-1]["email"], users[-1]["id"])
+
+    return {"users": users, "next_cursor": next_cursor, "estimated_total": estimated_total}
+
+
 # READ - Haal specifieke user op
 @router.get("/{user_id}", response_model=UserResponse)
 def get_user(user_id: UUID, db: Session = Depends(get_db)):
@@ -84,44 +191,67 @@ def get_user(user_id: UUID, db: Session = Depends(get_db)):
 
 
 # UPDATE - Update user gegevens
+# Async, net als registreren: bcrypt wacht op de password pool zonder een
+# thread van de threadpool vast te houden.
 @router.put("/{user_id}", response_model=UserResponse)
-def update_user(user_id: UUID, user_data: UserUpdate, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
-    
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User niet gevonden"
-        )
-    
+async def update_user(user_id: UUID, user_data: UserUpdate, db: AsyncSession = Depends(get_async_db)):
     # Update alleen de velden die zijn meegegeven
     update_data = user_data.model_dump(exclude_unset=True)
     
     # Hash wachtwoord als het wordt geupdate
     if "password" in update_data:
-        update_data["hashed_password"] = hash_password(update_data.pop("password"))
+        update_data["hashed_password"] = await hash_password_async(update_data.pop("password"))
     
-    for field, value in update_data.items():
-        setattr(user, field, value)
+    if update_data:
+        stmt = (
+            update(User)
+            .where(User.id == user_id)
+            .values(**update_data)
+            .returning(*USER_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )
+    else:
+        stmt = select(*USER_COLUMNS).where(User.id == user_id)
     
-    db.commit()
-    db.refresh(user)
+    try:
+        row = (await db.execute(stmt)).first()
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email is al geregistreerd"
+        )
     
-    return user
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User niet gevonden"
+        )
+    
+    invalidate_user(user_id)
+    
+    return dict(zip(USER_FIELDS, row))
 
 
 # DELETE - Verwijder user
+# Orders gaan mee via ON DELETE CASCADE in de database
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_user(user_id: UUID, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
+    deleted = db.execute(
+        delete(User)
+        .where(User.id == user_id)
+        .returning(User.id)
+        .execution_options(synchronize_session=False)
+    ).first()
     
-    if not user:
+    if deleted is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User niet gevonden"
         )
     
-    db.delete(user)
     db.commit()
+    invalidate_user(user_id)
     
-    return None
\ No newline at end of file
+    return None
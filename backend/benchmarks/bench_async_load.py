@@ -0,0 +1,82 @@
+"""Gelijktijdige requests op één worker: sync Session tegenover AsyncSession.
+
+Gebruik (vanuit backend/, tegen een scratch database):
+    DB_POOL_SIZE=100 DB_MAX_OVERFLOW=0 python -m benchmarks.bench_async_load --concurrency 200
+
+Twee identieke endpoints met de echte dependencies (get_db en get_async_db)
+doen een query van --latency seconden (pg_sleep), zoals een trage of ver
+weg staande database. Alle requests gaan tegelijk via één event loop naar
+de app, net als bij één uvicorn worker. De sync variant wacht op een thread
+van de threadpool (standaard 40), de async variant alleen op de pool.
+Zet de pool groter dan de threadpool om dat verschil te zien.
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from database import DB_MAX_OVERFLOW, DB_POOL_SIZE, ReleasingRoute, get_async_db, get_db
+
+app = FastAPI()
+app.router.route_class = ReleasingRoute
+
+
+@app.get("/sync")
+def sync_query(latency: float, db: Session = Depends(get_db)):
+    db.execute(text("SELECT pg_sleep(:latency)"), {"latency": latency})
+    return {"ok": True}
+
+
+@app.get("/async")
+async def async_query(latency: float, db: AsyncSession = Depends(get_async_db)):
+    await db.execute(text("SELECT pg_sleep(:latency)"), {"latency": latency})
+    return {"ok": True}
+
+
+async def run(path: str, concurrency: int, rounds: int, latency: float) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        # Opwarmen: verbindingen openen en de eerste connect queries
+        await client.get(path, params={"latency": 0})
+
+        samples = []
+
+        async def one():
+            started = time.perf_counter()
+            response = await client.get(path, params={"latency": latency})
+            response.raise_for_status()
+            samples.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for _ in range(rounds):
+            await asyncio.gather(*(one() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    samples.sort()
+    return {
+        "requests_per_s": round(len(samples) / elapsed, 1),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1] * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    print(f"Pool: {DB_POOL_SIZE} + {DB_MAX_OVERFLOW} overflow, {args.concurrency} gelijktijdige requests, "
+          f"query van {args.latency * 1000:.0f} ms")
+    for name, path in (("sync (threadpool)", "/sync"), ("async (asyncpg)", "/async")):
+        result = asyncio.run(run(path, args.concurrency, args.rounds, args.latency))
+        print(f"{name:18} {result['requests_per_s']:8.1f} req/s   p95 {result['p95_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
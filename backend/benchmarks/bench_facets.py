@@ -0,0 +1,100 @@
+"""Facets uit item_facet_counts tegenover een naive GROUP BY over items.
+
+Gebruik (vanuit backend/, tegen een scratch database):
+    python -m benchmarks.bench_facets --items 10000 100000
+
+Meet per catalogusgrootte de latency van de facet queries zoals
+GET /api/items/facets ze doet, en van drie GROUP BY queries over items die
+hetzelfde antwoord geven. Daarnaast de doorvoer van gelijktijdige item
+updates die allemaal dezelfde facet rij raken (de trigger schrijft deltas).
+"""
+import argparse
+import random
+
+from sqlalchemy import case, func, select, update
+
+from benchmarks.common import cleanup, seed_items
+from benchmarks.timing import concurrently, timed
+from database import SessionLocal
+from models.items import Item
+from utils.facets import compact_facet_deltas, facet_counts_stmt
+
+
+def precomputed(db, category):
+    rows = db.execute(facet_counts_stmt()).all()
+    # Zelfde werk als het endpoint: filteren en optellen in Python
+    total = sum(row.item_count for row in rows if category is None or row.category == category)
+    return total
+
+
+def naive(db, category):
+    bucket = func.item_price_bucket(Item.price)
+    filtered = Item.is_active == True
+    if category is not None:
+        filtered = filtered & (Item.category == category)
+    db.execute(select(Item.category, func.count()).where(Item.is_active == True).group_by(Item.category)).all()
+    db.execute(select(bucket, func.count()).where(filtered).group_by(bucket)).all()
+    return db.execute(
+        select(func.count(), func.count(case((Item.stock > 0, 1)))).where(filtered)
+    ).one()
+
+
+def write_throughput(item_ids, threads, seconds):
+    sessions = [SessionLocal() for _ in range(threads)]
+
+    def worker(index):
+        db = sessions[index]
+        # Zelfde categorie en prijsband heen en weer: elke update raakt de facets
+        db.execute(
+            update(Item)
+            .where(Item.id == random.choice(item_ids))
+            .values(stock=case((Item.stock > 0, 0), else_=10))
+        )
+        db.commit()
+        return 1
+
+    try:
+        return concurrently(worker, threads, seconds)
+    finally:
+        for db in sessions:
+            db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    try:
+        seeded = 0
+        item_ids = []
+        for size in sorted(args.items):
+            item_ids += seed_items(size - seeded)
+            seeded = size
+
+            db = SessionLocal()
+            try:
+                compact_facet_deltas(db)
+                for category in (None, "Booster"):
+                    fast = timed(lambda: precomputed(db, category), args.repeat)
+                    slow = timed(lambda: naive(db, category), args.repeat)
+                    print(f"{size:>8} items, categorie={category}: facet tabel {fast}  naive {slow}")
+            finally:
+                db.close()
+
+        ops = write_throughput(item_ids, args.threads, args.seconds)
+        print(f"Item updates met facet trigger, {args.threads} threads: {ops:.0f}/s")
+    finally:
+        cleanup()
+        db = SessionLocal()
+        try:
+            compact_facet_deltas(db)
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Orders per seconde: commit per request tegenover group commit.
+
+Gebruik (vanuit backend/, tegen een scratch database):
+    python -m benchmarks.bench_group_commit --threads 32 --seconds 10
+
+Roept _place_order direct aan vanuit veel threads (zoals de threadpool bij
+een checkout piek), eerst met een commit per order en daarna met
+ORDER_GROUP_COMMIT aan. Elke order koopt één willekeurig item uit een grote
+voorraad, zodat de commit kosten het verschil maken en niet lock contentie.
+"""
+import argparse
+import random
+
+import api.orders as orders
+from benchmarks.common import cleanup, seed_items, seed_user
+from benchmarks.timing import concurrently
+from database import SessionLocal, engine
+from schemas.orders import OrderCreate
+from utils.auth import AuthUser
+
+ADDRESS = {"street": "Straat", "house_number": "1", "postal_code": "1234AB", "city": "Utrecht"}
+
+
+def run(item_ids, user, threads, seconds, group_commit):
+    orders.ORDER_GROUP_COMMIT = group_commit
+    sessions = [SessionLocal() for _ in range(threads)]
+
+    def worker(index):
+        order = OrderCreate(
+            items=[{"item_id": str(random.choice(item_ids)), "quantity": 1}],
+            address=ADDRESS,
+        )
+        orders._place_order(order, sessions[index], user)
+        return 1
+
+    try:
+        return concurrently(worker, threads, seconds)
+    finally:
+        for db in sessions:
+            db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--items", type=int, default=1000)
+    args = parser.parse_args()
+
+    if args.threads > engine.pool.size() + engine.pool._max_overflow:
+        print("Let op: meer threads dan verbindingen in de pool (DB_POOL_SIZE/DB_MAX_OVERFLOW)")
+
+    try:
+        item_ids = seed_items(args.items, stock=10_000_000, out_of_stock=0)
+        user_id = seed_user()
+        user = AuthUser(user_id, "bench@example.com", False, True)
+
+        direct = run(item_ids, user, args.threads, args.seconds, group_commit=False)
+        print(f"Commit per order:  {direct:.0f} orders/s")
+        grouped = run(item_ids, user, args.threads, args.seconds, group_commit=True)
+        stats = orders.order_queue.stats()
+        print(f"Group commit:      {grouped:.0f} orders/s (gemiddelde batch {stats['avg_batch_size']})")
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Checkout doorvoer op één populair item: gewone voorraad tegenover shards.
+
+Gebruik (vanuit backend/, tegen een scratch database):
+    python -m benchmarks.bench_hot_item --threads 32 --shards 16
+
+Voor: alle kopers bestellen hetzelfde gewone item en wachten op dezelfde
+items rij. Na: hetzelfde item is hot (voorraad in shards); elke koper
+reserveert eerst uit een willekeurige shard en bestelt daarna, zoals de
+frontend dat via /reservations doet.
+"""
+import argparse
+
+import api.orders as orders
+from benchmarks.common import cleanup, seed_items, seed_user
+from benchmarks.timing import concurrently
+from database import SessionLocal
+from schemas.orders import OrderCreate
+from utils.auth import AuthUser
+from utils.reservations import reserve, shard_item
+
+ADDRESS = {"street": "Straat", "house_number": "1", "postal_code": "1234AB", "city": "Utrecht"}
+
+
+def run(item_id, users, seconds, hot):
+    sessions = [SessionLocal() for _ in users]
+    order = OrderCreate(items=[{"item_id": str(item_id), "quantity": 1}], address=ADDRESS)
+
+    def worker(index):
+        db, user = sessions[index], users[index]
+        if hot:
+            reserve(db, user.id, item_id, 1)
+        orders._place_order(order, db, user)
+        return 1
+
+    try:
+        return concurrently(worker, len(users), seconds)
+    finally:
+        for db in sessions:
+            db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--shards", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    orders.ORDER_GROUP_COMMIT = False
+    try:
+        item_id = seed_items(1, stock=10_000_000, out_of_stock=0)[0]
+        users = [AuthUser(seed_user(), "bench@example.com", False, True) for _ in range(args.threads)]
+
+        before = run(item_id, users, args.seconds, hot=False)
+        print(f"Gewone voorraad:        {before:.0f} checkouts/s")
+
+        db = SessionLocal()
+        try:
+            shard_item(db, item_id, args.shards)
+        finally:
+            db.close()
+        after = run(item_id, users, args.seconds, hot=True)
+        print(f"Hot item, {args.shards} shards:  {after:.0f} checkouts/s (reserveren + bestellen)")
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
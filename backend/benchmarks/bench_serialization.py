@@ -0,0 +1,81 @@
+"""Micro-benchmark: FAST_JSON pad tegenover het standaard response_model pad.
+
+Gebruik (vanuit backend/, geen database nodig):
+    python -m benchmarks.bench_serialization --rows 100 1000 10000
+
+Het standaard pad doet wat FastAPI met response_model=List[ItemResponse]
+doet: per rij valideren vanuit attributen (from_attributes), dumpen in JSON
+modus en met json.dumps encoderen. Het snelle pad gebruikt rows_to_dicts en
+to_json op platte rijen, zoals _load_items met FAST_JSON. Beide moeten
+dezelfde JSON opleveren; dat wordt eerst gecontroleerd.
+"""
+import argparse
+import json
+import random
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import List
+from uuid import uuid4
+
+from pydantic import TypeAdapter
+
+from benchmarks.timing import timed
+from schemas.items import ItemResponse
+from utils.serialization import orjson, rows_to_dicts, to_json
+
+ITEM_FIELDS = list(ItemResponse.model_fields)
+adapter = TypeAdapter(List[ItemResponse])
+
+
+def make_rows(count: int) -> list:
+    now = datetime(2026, 10, 1, 12, 0, 0, 123456)
+    return [
+        (
+            uuid4(),
+            f"Kaart {i}",
+            "Holo" if i % 3 else None,
+            round(random.uniform(1, 400), 2),
+            None,
+            random.choice(["Booster", "Single", None]),
+            random.randint(0, 50),
+            True,
+            now + timedelta(seconds=i),
+            None if i % 2 else now,
+        )
+        for i in range(count)
+    ]
+
+
+def pydantic_path(objects) -> bytes:
+    validated = adapter.validate_python(objects, from_attributes=True)
+    content = adapter.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path(rows) -> bytes:
+    return to_json(rows_to_dicts(ITEM_FIELDS, rows))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"Encoder: {'orjson' if orjson is not None else 'json'}")
+    for count in args.rows:
+        rows = make_rows(count)
+        # ORM objecten nabootsen: attributen in plaats van tuples
+        objects = [SimpleNamespace(**dict(zip(ITEM_FIELDS, row))) for row in rows]
+
+        if json.loads(pydantic_path(objects)) != json.loads(fast_path(rows)):
+            raise SystemExit(f"Verschillende JSON bij {count} rijen")
+
+        slow = timed(lambda: pydantic_path(objects), args.repeat)
+        fast = timed(lambda: fast_path(rows), args.repeat)
+        speedup = slow["p50_ms"] / fast["p50_ms"] if fast["p50_ms"] else float("inf")
+        print(f"{count:>6} rijen: pydantic {slow}  fast {fast}  ({speedup:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Hulpjes voor de benchmarks.
+
+De benchmarks schrijven in de database uit DATABASE_URL: gebruik een
+scratch database met het schema van `alembic upgrade head`, nooit productie.
+Testdata krijgt de prefix BENCH_PREFIX en wordt na afloop weer opgeruimd.
+"""
+import random
+import time
+from typing import List
+from uuid import UUID
+
+from sqlalchemy import delete, insert, text
+
+from database import SessionLocal
+from models.items import Item
+from models.user import User
+
+BENCH_PREFIX = "bench-"
+CATEGORIES = ["Booster", "Single", "Deck", "Tin", "Accessoire", None]
+
+
+def seed_items(count: int, stock: int = 100, out_of_stock: float = 0.5) -> List[UUID]:
+    """Maak `count` testitems in batches en geef hun ids terug. Een fractie
+    `out_of_stock` krijgt voorraad 0, de rest `stock`."""
+    db = SessionLocal()
+    try:
+        ids = []
+        for start in range(0, count, 5000):
+            rows = [
+                {
+                    "name": f"{BENCH_PREFIX}{start + i}",
+                    "price": round(random.uniform(1, 400), 2),
+                    "category": random.choice(CATEGORIES),
+                    "stock": 0 if random.random() < out_of_stock else stock,
+                    "is_active": True,
+                }
+                for i in range(min(5000, count - start))
+            ]
+            ids += db.execute(insert(Item).returning(Item.id), rows).scalars().all()
+        db.commit()
+        return ids
+    finally:
+        db.close()
+
+
+def seed_user() -> UUID:
+    db = SessionLocal()
+    try:
+        user_id = db.execute(
+            insert(User)
+            .values(
+                email=f"{BENCH_PREFIX}{time.time_ns()}@example.com",
+                hashed_password="x",
+                is_active=True,
+                is_admin=False,
+            )
+            .returning(User.id)
+        ).scalar()
+        db.commit()
+        return user_id
+    finally:
+        db.close()
+
+
+def cleanup() -> None:
+    """Verwijder alle testdata (orders gaan mee via ON DELETE CASCADE)"""
+    db = SessionLocal()
+    try:
+        db.execute(delete(User).where(User.email.like(f"{BENCH_PREFIX}%")))
+        for table in ("stock_reservations", "item_stock_shards"):
+            db.execute(text(f"DELETE FROM {table} WHERE item_id IN (SELECT id FROM items WHERE name LIKE :p)"),
+                       {"p": f"{BENCH_PREFIX}%"})
+        db.execute(delete(Item).where(Item.name.like(f"{BENCH_PREFIX}%")))
+        db.commit()
+    finally:
+        db.close()
@@ -0,0 +1,39 @@
+"""Tijdmeting voor de benchmarks (zonder database)"""
+import statistics
+import threading
+import time
+from typing import Callable
+
+
+def timed(fn: Callable, repeat: int) -> dict:
+    """Draai fn `repeat` keer en geef latency statistieken in ms"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+    }
+
+
+def concurrently(worker: Callable[[int], int], threads: int, seconds: float) -> float:
+    """Laat `threads` threads `seconds` lang worker(i) herhalen; worker geeft
+    het aantal geslaagde operaties terug. Resultaat: operaties per seconde."""
+    done = [0] * threads
+    stop = time.perf_counter() + seconds
+
+    def run(index: int) -> None:
+        while time.perf_counter() < stop:
+            done[index] += worker(index)
+
+    pool = [threading.Thread(target=run, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return sum(done) / (time.perf_counter() - started)
@@ -0,0 +1,139 @@
+"""Beheer commando's voor de backend.
+
+Gebruik:
+    python cli.py import-items kaarten.csv
+    python cli.py import-items kaarten.ndjson --format ndjson
+    python cli.py export-items --format ndjson -o items.ndjson
+    python cli.py backfill-sales --batch-days 30
+    python cli.py create-partitions --months-ahead 3
+    python cli.py archive-orders --older-than 12
+    python cli.py sweep-reservations
+"""
+import argparse
+import sys
+
+from fastapi import HTTPException
+
+from database import SessionLocal
+from utils.bulk_items import import_items, export_items
+from utils.partitions import ensure_partitions, archive_older_than
+from utils.reservations import sweep
+from utils.sales_rollups import backfill
+
+
+def cmd_import_items(args):
+    db = SessionLocal()
+    try:
+        with open(args.file, "rb") as source:
+            result = import_items(db, source, args.format)
+    except HTTPException as e:
+        print(f"Fout: {e.detail}", file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+
+    print(
+        f"{result['rows']} rijen ({result['inserted']} nieuw, {result['updated']} bijgewerkt) "
+        f"in {result['seconds']}s, {result['rows_per_sec']} rijen/s"
+    )
+    return 0
+
+
+def cmd_export_items(args):
+    stats = {}
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for chunk in export_items(args.format, stats=stats):
+            out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
+
+    rows, seconds = stats["rows"], stats["seconds"]
+    print(f"{rows} rijen in {seconds:.2f}s, {rows / seconds:.0f} rijen/s", file=sys.stderr)
+    return 0
+
+
+def cmd_backfill_sales(args):
+    db = SessionLocal()
+    try:
+        result = backfill(
+            db,
+            batch_days=args.batch_days,
+            progress=lambda start, end, count: print(f"{start} t/m {end}: {count} orders", file=sys.stderr),
+        )
+    finally:
+        db.close()
+
+    print(f"{result['orders']} orders in {result['seconds']}s, {result['orders_per_sec']} orders/s")
+    return 0
+
+
+def cmd_create_partitions(args):
+    db = SessionLocal()
+    try:
+        months = ensure_partitions(db, months_ahead=args.months_ahead)
+    finally:
+        db.close()
+
+    print(f"Partities aanwezig voor: {', '.join(months)}")
+    return 0
+
+
+def cmd_archive_orders(args):
+    db = SessionLocal()
+    try:
+        months = archive_older_than(db, months=args.older_than)
+    finally:
+        db.close()
+
+    print(f"Gearchiveerd: {', '.join(months) or 'niets'}")
+    return 0
+
+
+def cmd_sweep_reservations(args):
+    db = SessionLocal()
+    try:
+        changed = sweep(db)
+    finally:
+        db.close()
+
+    print(f"Voorraad bijgewerkt voor {len(changed)} hot items")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pokemon Winkel beheer")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("import-items", help="Items importeren (upsert op naam)")
+    p.add_argument("file")
+    p.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    p.set_defaults(func=cmd_import_items)
+
+    p = commands.add_parser("export-items", help="Alle items exporteren")
+    p.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    p.add_argument("-o", "--output", help="Bestand (standaard stdout)")
+    p.set_defaults(func=cmd_export_items)
+
+    p = commands.add_parser("backfill-sales", help="Sales rollups opnieuw opbouwen")
+    p.add_argument("--batch-days", type=int, default=7)
+    p.set_defaults(func=cmd_backfill_sales)
+
+    p = commands.add_parser("create-partitions", help="Maandpartities voor orders aanmaken")
+    p.add_argument("--months-ahead", type=int, default=3)
+    p.set_defaults(func=cmd_create_partitions)
+
+    p = commands.add_parser("archive-orders", help="Oude maanden naar het archief verplaatsen")
+    p.add_argument("--older-than", type=int, default=12, help="Aantal maanden")
+    p.set_defaults(func=cmd_archive_orders)
+
+    p = commands.add_parser("sweep-reservations", help="Verlopen reserveringen teruggeven")
+    p.set_defaults(func=cmd_sweep_reservations)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,62 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from api.user import router as user_router
 from api.items import router as items_router
 from api.admin import router as admin_router
 from api.orders import router as orders_router
+from api.analytics import router as analytics_router
+from api.reservations import router as reservations_router
+from database import READ_AFTER_COOKIE, replica_router
+from utils.facets import FACET_COMPACT_INTERVAL, FACET_COMPACT_LOCK, compact_facet_deltas
+from utils.item_cache import invalidate_item
+from utils.metrics import MetricsMiddleware, registry
+from utils.partitions import PARTITION_CHECK_INTERVAL, PARTITION_LOCK, ensure_partitions
+from utils.periodic import PeriodicTask
+from utils.replicas import ReadYourWritesMiddleware
+from utils.reservations import ReservationSweeper
+from utils.sales_rollups import SALES_ROLLUP_INTERVAL, SALES_ROLLUP_LOCK, compact_sales_rollups
+
+
+def _refresh_items(item_ids):
+    for item_id in item_ids:
+        invalidate_item(item_id, stock_only=True)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Verlopen reserveringen teruggeven en voorraad van hot items bijwerken
+    sweeper = ReservationSweeper(on_change=_refresh_items)
+    # Facet deltas van de items trigger optellen in item_facet_counts
+    facet_compactor = PeriodicTask(
+        "facet-compact", compact_facet_deltas, FACET_COMPACT_INTERVAL, lock_key=FACET_COMPACT_LOCK,
+    )
+    # Order deltas optellen in de sales rollups
+    sales_rollups = PeriodicTask(
+        "sales-rollups", compact_sales_rollups, SALES_ROLLUP_INTERVAL, lock_key=SALES_ROLLUP_LOCK,
+    )
+    # Maandpartities voor orders op tijd aanmaken (ook direct bij het starten)
+    partitioner = PeriodicTask(
+        "order-partitions", ensure_partitions, PARTITION_CHECK_INTERVAL,
+        lock_key=PARTITION_LOCK, run_at_start=True,
+    )
+    sweeper.start()
+    facet_compactor.start()
+    sales_rollups.start()
+    partitioner.start()
+    replica_router.start()
+    yield
+    sweeper.stop()
+    facet_compactor.stop()
+    sales_rollups.stop()
+    partitioner.stop()
+    replica_router.stop()
+
 
-app = FastAPI(title="Pokemon Winkel API")
+app = FastAPI(title="Pokemon Winkel API", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -17,13 +67,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Read-your-writes: na een geslaagde schrijfactie krijgt de client de WAL
+# positie van de primary mee in een cookie; get_read_db leest daarna alleen
+# van replicas die zo ver zijn. Zonder replicas is dat niet nodig.
+if replica_router.replicas:
+    app.add_middleware(ReadYourWritesMiddleware, router=replica_router, cookie=READ_AFTER_COOKIE)
+
+
+# Prometheus metrics; als laatste toegevoegd, dus buitenste laag
+app.add_middleware(MetricsMiddleware)
+
+
 # Routers
 app.include_router(user_router, prefix="/api")
 app.include_router(items_router, prefix="/api")
 app.include_router(admin_router, prefix="/api")
 app.include_router(orders_router, prefix="/api")
+app.include_router(analytics_router, prefix="/api")
+app.include_router(reservations_router, prefix="/api")
 
 
 @app.get("/")
 def root():
-    return {"message": "Pokemon Winkel API"}
\ No newline at end of file
+    return {"message": "Pokemon Winkel API"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
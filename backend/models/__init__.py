@@ -3,5 +3,7 @@ from sqlalchemy.orm import declarative_base
 Base = declarative_base()
 
 from models.user import User
-from models.items import Item
-from models.orders import Order, OrderItem
\ No newline at end of file
+from models.items import Item, ItemFacetCount, ItemFacetDelta
+from models.orders import Order, OrderItem, ArchivedOrder, ArchivedOrderItem
+from models.analytics import SalesDaily, SalesItemDaily, SalesCategoryDaily, SalesCityDaily, SalesRollupDelta
+from models.inventory import ItemStockShard, StockReservation
\ No newline at end of file
@@ -0,0 +1,57 @@
+from sqlalchemy import Column, String, Integer, BigInteger, SmallInteger, Float, Date, DateTime, Identity
+from sqlalchemy.dialects.postgresql import UUID
+
+from models import Base
+
+# Rollup tabellen voor sales analytics. Het plaatsen of annuleren van een
+# order schrijft in zijn eigen transactie alleen een rij in
+# sales_rollup_deltas (record_orders() in utils/sales_rollups.py); een
+# achtergrondtaak telt die elke paar seconden op in de rollups (geannuleerde
+# orders tellen niet mee). Opnieuw opbouwen: `python cli.py backfill-sales`.
+
+
+class SalesDaily(Base):
+    __tablename__ = "sales_daily"
+
+    day = Column(Date, primary_key=True)
+    orders = Column(Integer, nullable=False, default=0)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+
+
+class SalesItemDaily(Base):
+    __tablename__ = "sales_item_daily"
+
+    day = Column(Date, primary_key=True)
+    item_id = Column(UUID(as_uuid=True), primary_key=True)
+    product_name = Column(String, nullable=False)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+
+
+class SalesCategoryDaily(Base):
+    __tablename__ = "sales_category_daily"
+
+    day = Column(Date, primary_key=True)
+    category = Column(String, primary_key=True)  # "" = geen categorie
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+
+
+class SalesCityDaily(Base):
+    __tablename__ = "sales_city_daily"
+
+    day = Column(Date, primary_key=True)
+    city = Column(String, primary_key=True)
+    orders = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+
+
+class SalesRollupDelta(Base):
+    """Nog niet verwerkte order voor de rollups (alleen inserts)"""
+    __tablename__ = "sales_rollup_deltas"
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    order_id = Column(UUID(as_uuid=True), nullable=False)
+    order_created_at = Column(DateTime, nullable=False)
+    sign = Column(SmallInteger, nullable=False)  # 1 geplaatst, -1 geannuleerd
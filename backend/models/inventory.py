@@ -0,0 +1,43 @@
+from sqlalchemy import Column, Boolean, Integer, DateTime, ForeignKey, Index, text
+from sqlalchemy.dialects.postgresql import UUID
+
+from models import Base
+
+# Voorraad van hot items (Item.is_hot) is verdeeld over shards, zodat
+# gelijktijdige kopers niet allemaal op dezelfde items rij wachten.
+# Items.stock is voor hot items alleen een weergavewaarde (som van de shards).
+
+
+class ItemStockShard(Base):
+    __tablename__ = "item_stock_shards"
+    __table_args__ = (
+        Index("ix_item_stock_shards_dirty", "item_id", postgresql_where=text("dirty")),
+    )
+
+    item_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("items.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    shard = Column(Integer, primary_key=True)
+    stock = Column(Integer, nullable=False, default=0)
+    # Gezet door een trigger bij elke voorraadwijziging, gewist door de sweeper
+    dirty = Column(Boolean, nullable=False, default=False, server_default=text("false"))
+
+
+class StockReservation(Base):
+    __tablename__ = "stock_reservations"
+
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        nullable=False,
+        server_default=text("gen_random_uuid()"),
+    )
+    # Geen foreign keys: een verlopen reservering moet altijd terug naar
+    # zijn shard kunnen, ook als de user intussen verwijderd is
+    user_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    item_id = Column(UUID(as_uuid=True), nullable=False)
+    shard = Column(Integer, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
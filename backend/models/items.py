@@ -1,12 +1,34 @@
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Integer, BigInteger, Float, Boolean, DateTime, Index, Computed, Identity, text
+from sqlalchemy.orm import deferred
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
 from datetime import datetime
 
 from models import Base
 
+# Grenzen van de prijsbanden voor facets, gelijk aan die in de trigger
+# (width_bucket geeft band 0 t/m len(PRICE_BUCKET_EDGES))
+PRICE_BUCKET_EDGES = [5, 10, 25, 50, 100, 250]
+
 
 class Item(Base):
     __tablename__ = "items"
+    __table_args__ = (
+        # Keyset paginatie over actieve items op (created_at, id)
+        Index(
+            "ix_items_active_created_at_id",
+            "created_at",
+            "id",
+            postgresql_where=text("is_active"),
+        ),
+        # Full-text zoeken en typo-tolerant zoeken op naam
+        Index("ix_items_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_items_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
 
     id = Column(
         UUID(as_uuid=True),
@@ -21,5 +43,41 @@ class Item(Base):
     category = Column(String, nullable=True, index=True)
     stock = Column(Integer, nullable=False, default=0)
     is_active = Column(Boolean, nullable=False, default=True)
+    is_hot = Column(Boolean, nullable=False, default=False)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
-    updated_at = Column(DateTime, nullable=True, onupdate=datetime.utcnow)
\ No newline at end of file
+    updated_at = Column(DateTime, nullable=True, onupdate=datetime.utcnow)
+    # Alleen voor zoeken, wordt niet standaard mee geladen
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(description, ''))",
+            persisted=True,
+        ),
+        nullable=True,
+    ))
+
+
+class ItemFacetCount(Base):
+    """Aantal actieve items per (categorie, prijsband, op voorraad).
+
+    De trigger op items schrijft wijzigingen naar item_facet_deltas; die
+    worden periodiek in deze tabel opgeteld (utils/facets.py). Het echte
+    aantal is deze tabel plus de nog niet verwerkte deltas.
+    """
+    __tablename__ = "item_facet_counts"
+
+    category = Column(String, primary_key=True)  # "" = geen categorie
+    price_bucket = Column(Integer, primary_key=True)
+    in_stock = Column(Boolean, primary_key=True)
+    item_count = Column(Integer, nullable=False, default=0)
+
+
+class ItemFacetDelta(Base):
+    """Nog niet verwerkte wijziging van een facet telling (alleen inserts)"""
+    __tablename__ = "item_facet_deltas"
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    category = Column(String, nullable=False)
+    price_bucket = Column(Integer, nullable=False)
+    in_stock = Column(Boolean, nullable=False)
+    delta = Column(Integer, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, text
+from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, ForeignKeyConstraint, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
@@ -6,8 +6,33 @@ from datetime import datetime
 from models import Base
 
 
+# Toegestane statusovergangen van een order
+ORDER_TRANSITIONS = {
+    "pending": {"paid", "cancelled"},
+    "paid": {"shipped", "cancelled"},
+    "shipped": {"delivered", "cancelled"},
+    "delivered": set(),
+    "cancelled": set(),
+}
+
+# orders en order_items zijn per maand gepartitioneerd op het aanmaakmoment
+# van de order (zie cli.py create-partitions / archive-orders). De primary key
+# van orders is daarom (id, created_at) en order_items verwijst via
+# (order_id, order_created_at).
+
+
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Orderhistorie per user, nieuwste eerst (keyset op created_at, id)
+        Index(
+            "ix_orders_user_id_created_at_id",
+            "user_id",
+            text("created_at DESC"),
+            text("id DESC"),
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     id = Column(
         UUID(as_uuid=True),
@@ -31,7 +56,7 @@ class Order(Base):
     city = Column(String, nullable=False)
     country = Column(String, nullable=False, default="Nederland")
     
-    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    created_at = Column(DateTime, primary_key=True, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, nullable=True, onupdate=datetime.utcnow)
 
     user = relationship("User", back_populates="orders")
@@ -40,6 +65,15 @@ class Order(Base):
 
 class OrderItem(Base):
     __tablename__ = "order_items"
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["order_id", "order_created_at"],
+            ["orders.id", "orders.created_at"],
+            name="order_items_order_fkey",
+            ondelete="CASCADE",
+        ),
+        {"postgresql_partition_by": "RANGE (order_created_at)"},
+    )
 
     id = Column(
         UUID(as_uuid=True),
@@ -47,12 +81,8 @@ class OrderItem(Base):
         nullable=False,
         server_default=text("gen_random_uuid()"),
     )
-    order_id = Column(
-        UUID(as_uuid=True),
-        ForeignKey("orders.id", ondelete="CASCADE"),
-        nullable=False,
-        index=True,
-    )
+    order_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    order_created_at = Column(DateTime, primary_key=True, nullable=False)
     item_id = Column(
         UUID(as_uuid=True),
         ForeignKey("items.id", ondelete="SET NULL"),
@@ -64,4 +94,48 @@ class OrderItem(Base):
     quantity = Column(Integer, nullable=False, default=1)
 
     order = relationship("Order", back_populates="items")
-    item = relationship("Item")
\ No newline at end of file
+    item = relationship("Item")
+
+
+# Gearchiveerde maanden: losgekoppelde partities, opnieuw gekoppeld aan deze
+# (alleen-lezen) tabellen. Zelfde kolommen, geen relaties.
+
+
+class ArchivedOrder(Base):
+    __tablename__ = "orders_archive"
+    __table_args__ = (
+        Index(
+            "ix_orders_archive_user_id_created_at_id",
+            "user_id",
+            text("created_at DESC"),
+            text("id DESC"),
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, nullable=False)
+    user_id = Column(UUID(as_uuid=True), nullable=False)
+    status = Column(String, nullable=False)
+    total_amount = Column(Float, nullable=False)
+    street = Column(String, nullable=False)
+    house_number = Column(String, nullable=False)
+    postal_code = Column(String, nullable=False)
+    city = Column(String, nullable=False)
+    country = Column(String, nullable=False)
+    created_at = Column(DateTime, primary_key=True, nullable=False)
+    updated_at = Column(DateTime, nullable=True)
+
+
+class ArchivedOrderItem(Base):
+    __tablename__ = "order_items_archive"
+    __table_args__ = (
+        {"postgresql_partition_by": "RANGE (order_created_at)"},
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, nullable=False)
+    order_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    order_created_at = Column(DateTime, primary_key=True, nullable=False)
+    item_id = Column(UUID(as_uuid=True), nullable=True)
+    product_name = Column(String, nullable=False)
+    product_price = Column(Float, nullable=False)
+    quantity = Column(Integer, nullable=False)
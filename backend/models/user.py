@@ -1,5 +1,5 @@
 # filepath: c:\Users\DylandeBeerLinden-IT\OneDrive - Linden-IT\Bureaublad\pokemonwinkel\eindopdracht-pokemon-winkel\backend\models\user.py
-from sqlalchemy import Column, String, Boolean, text
+from sqlalchemy import Column, String, Boolean, Index, func, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -22,4 +22,32 @@ class User(Base):
     is_active = Column(Boolean, nullable=True, default=True)
     is_admin = Column(Boolean, nullable=False, default=False)
 
-    orders = relationship("Order", back_populates="user", cascade="all, delete-orphan")
\ No newline at end of file
+    orders = relationship("Order", back_populates="user", cascade="all, delete-orphan")
+
+
+# Zoekindexen voor de user lijst (migratie f4b19c7e2a68). Prefix zoeken
+# (LIKE 'abc%') op email en namen, hoofdletterongevoelig
+Index(
+    "ix_users_email_prefix",
+    func.lower(User.email).label("email_lower"),
+    postgresql_ops={"email_lower": "text_pattern_ops"},
+)
+Index(
+    "ix_users_first_name_prefix",
+    func.lower(User.first_name).label("first_name_lower"),
+    postgresql_ops={"first_name_lower": "text_pattern_ops"},
+)
+Index(
+    "ix_users_last_name_prefix",
+    func.lower(User.last_name).label("last_name_lower"),
+    postgresql_ops={"last_name_lower": "text_pattern_ops"},
+)
+# Substring zoeken (LIKE '%abc%'); gelijk aan USER_SEARCH_TEXT in api/user.py
+Index(
+    "ix_users_search_trgm",
+    func.lower(
+        User.email + " " + func.coalesce(User.first_name, "") + " " + func.coalesce(User.last_name, "")
+    ).label("search_text"),
+    postgresql_using="gin",
+    postgresql_ops={"search_text": "gin_trgm_ops"},
+)
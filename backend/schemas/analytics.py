@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+from typing import Optional
+from uuid import UUID
+from datetime import date
+
+
+class DailyRevenue(BaseModel):
+    day: date
+    orders: int
+    units: int
+    revenue: float
+
+
+class ItemRevenue(BaseModel):
+    item_id: UUID
+    product_name: str
+    units: int
+    revenue: float
+
+
+class CategoryRevenue(BaseModel):
+    category: Optional[str] = None
+    units: int
+    revenue: float
+
+
+class CityRevenue(BaseModel):
+    city: str
+    orders: int
+    revenue: float
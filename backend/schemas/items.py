@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
 
@@ -36,4 +36,47 @@ class ItemResponse(BaseModel):
     updated_at: Optional[datetime] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class ItemPage(BaseModel):
+    items: List[ItemResponse]
+    next_cursor: Optional[str] = None
+
+
+
+class FacetCount(BaseModel):
+    value: Optional[str] = None
+    count: int
+
+
+class PriceBucketCount(BaseModel):
+    bucket: int
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    count: int
+
+
+class ItemFacets(BaseModel):
+    total: int
+    in_stock: int
+    categories: List[FacetCount]
+    price_buckets: List[PriceBucketCount]
+
+
+
+class ItemBulkUpdate(BaseModel):
+    id: UUID
+    price: Optional[float] = None
+    stock: Optional[int] = None
+    is_active: Optional[bool] = None
+
+
+class ItemBulkError(BaseModel):
+    id: UUID
+    detail: str
+
+
+class ItemBulkUpdateResult(BaseModel):
+    updated: List[UUID]
+    errors: List[ItemBulkError]
@@ -1,13 +1,15 @@
 from pydantic import BaseModel, field_serializer
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 from uuid import UUID
 
 
 class OrderItemCreate(BaseModel):
     item_id: str
-    product_name: str
-    product_price: float
+    # Naam en prijs worden uit de database gehaald, deze velden zijn
+    # alleen nog voor oudere clients en foutmeldingen
+    product_name: Optional[str] = None
+    product_price: Optional[float] = None
     quantity: int
 
 
@@ -56,3 +58,23 @@ class OrderResponse(BaseModel):
     @field_serializer('id')
     def serialize_id(self, id: UUID) -> str:
         return str(id)
+
+
+class OrderPage(BaseModel):
+    orders: List[OrderResponse]
+    next_cursor: Optional[str] = None
+
+
+class OrderStatusUpdate(BaseModel):
+    order_ids: List[UUID]
+    status: Literal["pending", "paid", "shipped", "delivered", "cancelled"]
+
+
+class OrderBulkError(BaseModel):
+    id: UUID
+    detail: str
+
+
+class OrderStatusUpdateResult(BaseModel):
+    updated: List[UUID]
+    errors: List[OrderBulkError]
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from datetime import datetime
+from uuid import UUID
+
+
+class ReservationCreate(BaseModel):
+    item_id: UUID
+    quantity: int = 1
+
+
+class ReservationResponse(BaseModel):
+    id: UUID
+    item_id: UUID
+    quantity: int
+    expires_at: datetime
+
+    class Config:
+        from_attributes = True
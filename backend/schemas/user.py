@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 
@@ -40,4 +40,11 @@ class UserResponse(BaseModel):
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str
-    user: UserResponse
\ No newline at end of file
+    user: UserResponse
+
+
+class UserSearchPage(BaseModel):
+    users: List[UserResponse]
+    next_cursor: Optional[str] = None
+    # Schatting uit de planner statistieken, geen exacte COUNT(*)
+    estimated_total: int
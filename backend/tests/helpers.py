@@ -0,0 +1,47 @@
+"""Hulpfuncties voor de tests"""
+import threading
+import uuid
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from models.user import User
+from utils.auth import create_access_token
+
+
+def make_user(db, is_admin: bool = False):
+    """Maak een user en geef (id, Authorization header) terug"""
+    user = User(
+        email=f"test-{uuid.uuid4().hex}@example.com",
+        hashed_password="x",
+        is_active=True,
+        is_admin=is_admin,
+    )
+    db.add(user)
+    db.commit()
+    token = create_access_token({"sub": str(user.id), "email": user.email})
+    return user.id, {"Authorization": f"Bearer {token}"}
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+        self.statements = []
+        self._lock = threading.Lock()
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        with self._lock:
+            self.count += 1
+            self.statements.append(statement)
+
+
+@contextmanager
+def count_statements():
+    """Tel alle SQL statements (alle engines, alle threads) in het blok"""
+    counter = StatementCounter()
+    event.listen(Engine, "after_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(Engine, "after_cursor_execute", counter)
@@ -0,0 +1,26 @@
+import io
+
+import pytest
+from fastapi import HTTPException
+
+from utils.bulk_items import ImportFormatError, NDJSONToCSV, import_items
+
+
+@pytest.mark.parametrize("fmt, content", [
+    ("csv", b"na\xffme,price\n"),
+    ("ndjson", b"{\"name\": \"Pikachu\"\n"),
+    ("ndjson", b"[1, 2]\n"),
+])
+def test_unreadable_header_is_400(fmt, content):
+    # Fout in de eerste regel: nog voor er een database nodig is
+    with pytest.raises(HTTPException) as info:
+        import_items(None, io.BytesIO(content), fmt)
+    assert info.value.status_code == 400
+
+
+def test_ndjson_records_must_have_the_header_fields():
+    lines = iter([b'{"name": "a", "price": 1}\n', b'{"name": "b", "price": 2, "stock": 5}\n'])
+    reader = NDJSONToCSV(lines, ["name", "price"])
+    with pytest.raises(ImportFormatError, match="Regel 2"):
+        reader.read()
+    assert reader.error is not None
@@ -0,0 +1,21 @@
+from utils.cache import LRUCache
+
+
+def test_recently_invalidated_tracks_tags_within_window():
+    cache = LRUCache(recent_window=60)
+    cache.set("a", 1, tags=["item-1"])
+    assert not cache.recently_invalidated(["item-1"])
+
+    # Ook een tag zonder entries telt: de entry kan nog gevuld worden
+    cache.invalidate_tag("item-2")
+    assert cache.recently_invalidated(["item-1", "item-2"])
+    assert not cache.recently_invalidated(["item-1"])
+
+    cache.clear()
+    assert cache.recently_invalidated(["item-3"])
+
+
+def test_recently_invalidated_is_off_without_window():
+    cache = LRUCache()
+    cache.invalidate_tag("item-1")
+    assert not cache.recently_invalidated(["item-1"])
@@ -0,0 +1,16 @@
+from uuid import uuid4
+
+from utils.item_cache import OFFSET_PAGES, invalidate_item, item_cache
+
+
+def test_stock_change_keeps_offset_pages():
+    item_id = uuid4()
+    item_cache.set(("offset", 0, 100), b"[]", tags=[OFFSET_PAGES])
+    item_cache.set(("item", item_id), {"id": item_id}, tags=[item_id])
+
+    invalidate_item(item_id, stock_only=True)
+    assert item_cache.get(("item", item_id)) is None
+    assert item_cache.get(("offset", 0, 100)) is not None
+
+    invalidate_item(item_id)
+    assert item_cache.get(("offset", 0, 100)) is None
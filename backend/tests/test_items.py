@@ -0,0 +1,12 @@
+import pytest
+
+
+@pytest.mark.parametrize("params", [
+    {"limit": 0},
+    {"limit": -1},
+    {"limit": 0, "cursor": ""},
+    {"limit": 100_000},
+    {"skip": -1},
+])
+def test_item_listing_rejects_bad_paging(client, params):
+    assert client.get("/api/items/", params=params).status_code == 422
@@ -0,0 +1,75 @@
+import asyncio
+
+from utils import metrics
+from utils.metrics import MetricsMiddleware
+
+
+def gauge(metric):
+    return metric._values.get((), 0)
+
+
+def observations(histogram, labels):
+    series = histogram._values.get(labels)
+    return 0 if series is None else sum(series[:-1])
+
+
+def run(app, path="/test"):
+    scope = {"type": "http", "method": "GET", "path": path, "app": None}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    asyncio.run(MetricsMiddleware(app)(scope, receive, send))
+
+
+def test_streaming_response_is_not_in_flight_or_in_latency():
+    labels = ("GET", "onbekend")
+    latency_before = observations(metrics.http_latency, labels)
+    streams_before = observations(metrics.http_stream_duration, labels)
+    seen = {}
+
+    async def app(scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"text/event-stream; charset=utf-8")],
+        })
+        # Tijdens de stream: wel open stream, geen lopende request
+        seen["in_flight"] = gauge(metrics.http_in_flight)
+        seen["streams"] = gauge(metrics.http_streams_open)
+        await send({"type": "http.response.body", "body": b"data: 1\n\n", "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    in_flight_before = gauge(metrics.http_in_flight)
+    run(app)
+
+    assert seen == {"in_flight": in_flight_before, "streams": 1}
+    assert gauge(metrics.http_streams_open) == 0
+    assert gauge(metrics.http_in_flight) == in_flight_before
+    assert observations(metrics.http_latency, labels) == latency_before
+    assert observations(metrics.http_stream_duration, labels) == streams_before + 1
+
+
+def test_regular_response_counts_as_request():
+    labels = ("GET", "onbekend")
+    latency_before = observations(metrics.http_latency, labels)
+    seen = {}
+
+    async def app(scope, receive, send):
+        seen["in_flight"] = gauge(metrics.http_in_flight)
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/json")],
+        })
+        await send({"type": "http.response.body", "body": b"{}", "more_body": False})
+
+    in_flight_before = gauge(metrics.http_in_flight)
+    run(app)
+
+    assert seen["in_flight"] == in_flight_before + 1
+    assert gauge(metrics.http_in_flight) == in_flight_before
+    assert observations(metrics.http_latency, labels) == latency_before + 1
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import insert
+
+from helpers import count_statements, make_user
+from models.orders import Order, OrderItem
+
+
+def seed_orders(db, user_id, count, lines_per_order=3):
+    now = datetime.utcnow()
+    orders, lines = [], []
+    for i in range(count):
+        created_at = now - timedelta(minutes=i)
+        order_id = uuid4()
+        orders.append({
+            "id": order_id,
+            "user_id": user_id,
+            "status": "pending",
+            "total_amount": 10.0 * lines_per_order,
+            "street": "Straat",
+            "house_number": "1",
+            "postal_code": "1234AB",
+            "city": "Utrecht",
+            "country": "Nederland",
+            "created_at": created_at,
+        })
+        lines += [
+            {
+                "id": uuid4(),
+                "order_id": order_id,
+                "order_created_at": created_at,
+                "item_id": None,
+                "product_name": f"Kaart {j}",
+                "product_price": 10.0,
+                "quantity": 1,
+            }
+            for j in range(lines_per_order)
+        ]
+    db.execute(insert(Order), orders)
+    db.execute(insert(OrderItem), lines)
+    db.commit()
+
+
+def history_statements(client, db, order_count, params):
+    user_id, headers = make_user(db)
+    seed_orders(db, user_id, order_count)
+
+    # Eerste request vult de auth cache, die telt niet mee
+    assert client.get("/api/orders/", headers=headers, params=params).status_code == 200
+
+    with count_statements() as counter:
+        response = client.get("/api/orders/", headers=headers, params=params)
+    assert response.status_code == 200
+    return counter.count, response.json()
+
+
+@pytest.mark.parametrize("params", [{}, {"cursor": "", "limit": 50}])
+def test_order_history_query_count_is_constant(client, db, params):
+    """Orderregels worden in een vast aantal queries geladen (geen N+1)"""
+    few, few_body = history_statements(client, db, 1, params)
+    many, many_body = history_statements(client, db, 30, params)
+
+    orders = many_body if isinstance(many_body, list) else many_body["orders"]
+    assert len(orders) == 30
+    assert all(len(order["items"]) == 3 for order in orders)
+    assert few == many
+
+
+def test_order_history_keyset_pages(client, db):
+    user_id, headers = make_user(db)
+    seed_orders(db, user_id, 5, lines_per_order=1)
+
+    seen = []
+    cursor = ""
+    while cursor is not None:
+        page = client.get("/api/orders/", headers=headers, params={"cursor": cursor, "limit": 2}).json()
+        seen += [order["id"] for order in page["orders"]]
+        cursor = page["next_cursor"]
+
+    assert len(seen) == len(set(seen)) == 5
+
+
+def test_get_order_includes_lines(client, db):
+    """De regels worden geladen voordat de sessie dicht gaat"""
+    user_id, headers = make_user(db)
+    seed_orders(db, user_id, 1, lines_per_order=2)
+    order_id = client.get("/api/orders/", headers=headers).json()[0]["id"]
+
+    response = client.get(f"/api/orders/{order_id}", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 2
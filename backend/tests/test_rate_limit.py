@@ -0,0 +1,27 @@
+from starlette.requests import Request
+
+from utils.rate_limit import MemoryBackend, client_ip
+
+
+def make_request(forwarded_for=None, host="10.0.0.1"):
+    headers = [] if forwarded_for is None else [(b"x-forwarded-for", forwarded_for.encode())]
+    return Request({"type": "http", "headers": headers, "client": (host, 1234)})
+
+
+def test_client_ip_without_proxy_ignores_header():
+    assert client_ip(make_request("1.2.3.4"), depth=0) == "10.0.0.1"
+
+
+def test_client_ip_behind_proxy_skips_spoofed_hops():
+    # Client zet zelf 6.6.6.6, de proxy voegt het echte adres toe
+    assert client_ip(make_request("6.6.6.6, 1.2.3.4"), depth=1) == "1.2.3.4"
+    assert client_ip(make_request("6.6.6.6, 1.2.3.4, 172.16.0.2"), depth=2) == "1.2.3.4"
+    assert client_ip(make_request(None), depth=1) == "10.0.0.1"
+
+
+def test_memory_backend_stays_under_max_keys():
+    backend = MemoryBackend(max_keys=10)
+    for number in range(100):
+        backend.hit(f"login-email:{number}", 5, 300)
+    assert len(backend._counters) <= 10
+    assert "login-email:99" in backend._counters
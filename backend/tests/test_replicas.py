@@ -0,0 +1,58 @@
+import asyncio
+
+from utils.replicas import ReadYourWritesMiddleware, Replica, ReplicaRouter
+
+
+def make_router(*replicas):
+    """Per replica (lag, afgespeelde WAL positie)"""
+    made = []
+    for index, (lag, replayed_lsn) in enumerate(replicas):
+        replica = Replica(f"replica-{index}", None, lambda index=index: f"replica-{index}", None)
+        replica.lag = lag
+        replica.replayed_lsn = replayed_lsn
+        made.append(replica)
+    return ReplicaRouter(made, lambda: "primary", None, max_lag=5.0)
+
+
+def test_reads_go_to_healthy_replicas():
+    router = make_router((1.0, 100), (None, None), (60.0, 50))
+    assert {router.session() for _ in range(4)} == {"replica-0"}
+
+
+def test_own_write_reads_from_primary_until_replayed():
+    router = make_router((0.0, 200), (3.0, 150))
+    # Schrijfactie op positie 180: replica-0 heeft hem, replica-1 nog niet
+    assert {router.session(180) for _ in range(4)} == {"replica-0"}
+    # Schrijfactie van na de laatste meting: geen enkele replica heeft hem
+    assert router.session(250) == "primary"
+
+
+def run(method, status=200):
+    router = make_router((0.0, 100))
+
+    async def primary_lsn():
+        return 4242
+
+    router.primary_lsn = primary_lsn
+    sent = []
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": status, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        sent.append(message)
+
+    middleware = ReadYourWritesMiddleware(app, router, "read_after")
+    asyncio.run(middleware({"type": "http", "method": method}, None, send))
+    return [value for name, value in sent[0]["headers"] if name == b"set-cookie"]
+
+
+def test_write_sets_primary_lsn_cookie():
+    (cookie,) = run("POST")
+    assert cookie.startswith(b"read_after=4242;")
+
+
+def test_reads_and_failed_writes_set_no_cookie():
+    assert run("GET") == []
+    assert run("POST", status=409) == []
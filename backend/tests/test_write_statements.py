@@ -0,0 +1,91 @@
+import os
+import uuid
+
+from helpers import count_statements, make_user
+from models.items import Item
+
+ADMIN_SECRET_KEY = os.getenv("ADMIN_SECRET_KEY", "super-secret-admin-key")
+
+
+def new_email():
+    return f"test-{uuid.uuid4().hex}@example.com"
+
+
+def make_item(db):
+    item = Item(name=f"test-{uuid.uuid4().hex}", price=10.0, stock=5, is_active=True)
+    db.add(item)
+    db.commit()
+    return item.id
+
+
+def admin_headers(client, db):
+    _, headers = make_user(db, is_admin=True)
+    # Eerste request vult de auth cache, die telt niet mee
+    assert client.get("/api/items/cache/stats", headers=headers).status_code == 200
+    return headers
+
+
+def register(client, email):
+    return client.post("/api/users/register", json={"email": email, "password": "geheim123"})
+
+
+def test_register_checks_email_before_hashing(client, db):
+    # Warm de async engine op (eerste connectie doet eigen queries)
+    assert register(client, new_email()).status_code == 201
+
+    email = new_email()
+    with count_statements() as counter:
+        assert register(client, email).status_code == 201
+    assert counter.count == 2  # email check + INSERT ... ON CONFLICT
+
+    with count_statements() as counter:
+        response = register(client, email)
+    assert response.status_code == 400
+    assert counter.count == 1  # alleen de email check, geen INSERT
+
+
+def test_user_writes_are_single_statement(client, db):
+    assert register(client, new_email()).status_code == 201
+    user_id, _ = make_user(db)
+
+    with count_statements() as counter:
+        assert client.put(f"/api/users/{user_id}", json={"first_name": "Ash"}).status_code == 200
+    assert counter.count == 1
+
+    with count_statements() as counter:
+        response = client.put(f"/api/admin/make-admin/{user_id}", params={"secret_key": ADMIN_SECRET_KEY})
+    assert response.status_code == 200
+    assert response.json()["is_admin"] is True
+    assert counter.count == 1
+
+    with count_statements() as counter:
+        assert client.delete(f"/api/users/{user_id}").status_code == 204
+    assert counter.count == 1
+
+    with count_statements() as counter:
+        assert client.delete(f"/api/users/{user_id}").status_code == 404
+    assert counter.count == 1
+
+
+def test_update_user_email_conflict_is_400(client, db):
+    taken = new_email()
+    assert register(client, taken).status_code == 201
+    user_id, _ = make_user(db)
+
+    response = client.put(f"/api/users/{user_id}", json={"email": taken})
+    assert response.status_code == 400
+
+
+def test_item_writes_are_single_statement(client, db):
+    headers = admin_headers(client, db)
+    item_id = make_item(db)
+
+    with count_statements() as counter:
+        response = client.put(f"/api/items/{item_id}", headers=headers, json={"price": 12.5})
+    assert response.status_code == 200
+    assert response.json()["price"] == 12.5
+    assert counter.count == 1
+
+    with count_statements() as counter:
+        assert client.delete(f"/api/items/{item_id}", headers=headers).status_code == 204
+    assert counter.count == 1
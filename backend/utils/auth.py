@@ -1,13 +1,16 @@
-import bcrypt
 from jose import jwt, JWTError
 from datetime import datetime, timedelta
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from typing import NamedTuple, Optional
+from uuid import UUID
 import os
+import time
 
-from database import get_db
+from database import SessionLocal
 from models.user import User
+from utils.cache import LRUCache
+from utils.passwords import password_hasher
 
 # JWT settings
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here-change-in-production")
@@ -17,19 +20,19 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 uur
 security = HTTPBearer()
 
 
-def hash_password(password: str) -> str:
-    """Hash een wachtwoord"""
-    password_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password_bytes, salt)
-    return hashed.decode('utf-8')
+async def hash_password_async(password: str) -> str:
+    """Hash een wachtwoord in de bcrypt process pool, zonder een thread vast te houden"""
+    return await password_hasher.hash_async(password)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verifieer wachtwoord tegen hash"""
-    password_bytes = plain_password.encode('utf-8')
-    hashed_bytes = hashed_password.encode('utf-8')
-    return bcrypt.checkpw(password_bytes, hashed_bytes)
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verifieer wachtwoord tegen hash in de bcrypt process pool, zonder een thread vast te houden"""
+    return await password_hasher.verify_async(plain_password, hashed_password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True als de hash met een andere cost dan BCRYPT_ROUNDS gemaakt is"""
+    return password_hasher.needs_rehash(hashed_password)
 
 
 def create_access_token(data: dict) -> str:
@@ -46,12 +49,42 @@ def decode_access_token(token: str) -> dict:
     return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Haal huidige ingelogde user op"""
-    token = credentials.credentials
+class AuthUser(NamedTuple):
+    """De ingelogde user zoals endpoints hem nodig hebben (geen ORM object)"""
+    id: UUID
+    email: str
+    is_admin: bool
+    is_active: Optional[bool]
+
+
+# Geverifieerde tokens -> AuthUser (per worker). update_user, delete_user en
+# make_user_admin invalideren via de user id tag; de TTL begrenst hoe lang
+# andere workers een oude rol kunnen zien.
+auth_cache = LRUCache(
+    maxsize=int(os.getenv("AUTH_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("AUTH_CACHE_TTL", "60")),
+)
+
+
+def invalidate_user(user_id) -> None:
+    """Gooi alle gecachte tokens van een user weg"""
+    auth_cache.invalidate_tag(str(user_id))
+
+
+def user_from_token(token: str) -> AuthUser:
+    """Zoek de user bij een JWT token op, uit de cache als dat kan.
+
+    Bij een cache miss met een eigen, kortlevende sessie: de verbinding gaat
+    direct na de lookup terug naar de pool, niet pas na de response (de
+    sessies van het endpoint zelf geeft ReleasingRoute vrij).
+    """
+    cached = auth_cache.get(token)
+    if cached is not None:
+        user, expires_at = cached
+        if expires_at > time.time():
+            return user
+        auth_cache.invalidate(token)
+
     try:
         payload = decode_access_token(token)
         user_id = payload.get("sub")
@@ -66,16 +99,25 @@ def get_current_user(
             detail="Ongeldige token"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
+    with SessionLocal() as db:
+        row = db.query(User.id, User.email, User.is_admin, User.is_active).filter(User.id == user_id).first()
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User niet gevonden"
         )
+    
+    user = AuthUser(*row)
+    auth_cache.set(token, (user, payload.get("exp", 0)), tags=[str(user.id)])
     return user
 
 
-def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> AuthUser:
+    """Haal huidige ingelogde user op"""
+    return user_from_token(credentials.credentials)
+
+
+def get_admin_user(current_user: AuthUser = Depends(get_current_user)) -> AuthUser:
     """Check of huidige user admin is"""
     if not current_user.is_admin:
         raise HTTPException(
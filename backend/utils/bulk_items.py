@@ -0,0 +1,269 @@
+import csv
+import io
+import json
+import logging
+import time
+from typing import IO, Iterator, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models.items import Item
+
+logger = logging.getLogger(__name__)
+
+# Kolommen die via import/export mogen, name is de upsert sleutel
+IMPORT_COLUMNS = ["name", "description", "price", "image_url", "category", "stock", "is_active"]
+EXPORT_COLUMNS = ["id"] + IMPORT_COLUMNS + ["created_at", "updated_at"]
+
+# pg_advisory_xact_lock sleutel: imports lopen na elkaar
+IMPORT_LOCK = 7_005_001
+
+STAGING_TABLE = """
+    CREATE TEMP TABLE items_import (
+        line bigserial,
+        name text,
+        description text,
+        price double precision,
+        image_url text,
+        category text,
+        stock integer,
+        is_active boolean
+    ) ON COMMIT DROP
+"""
+
+
+class ImportFormatError(ValueError):
+    """Bestand is niet te lezen; de melding gaat als 400 naar de client"""
+
+
+def _parse_record(line: bytes, number: int) -> dict:
+    try:
+        record = json.loads(line)
+    except ValueError:  # ook UnicodeDecodeError
+        raise ImportFormatError(f"Regel {number} is geen geldige JSON")
+    if not isinstance(record, dict):
+        raise ImportFormatError(f"Regel {number} is geen JSON object")
+    return record
+
+
+class NDJSONToCSV(io.RawIOBase):
+    """File-achtig object dat NDJSON regels on-the-fly als CSV teruggeeft,
+    zodat COPY het kan lezen zonder dat alles in geheugen staat.
+
+    Elk record moet dezelfde velden hebben als het eerste (de kolommen van
+    de COPY); anders volgt een ImportFormatError in plaats van dat velden
+    stil wegvallen.
+    """
+
+    def __init__(self, lines: Iterator[bytes], columns: List[str]):
+        self._lines = lines
+        self._columns = columns
+        self._column_set = set(columns)
+        self._number = 0
+        self._buffer = b""
+        self.error: Optional[ImportFormatError] = None
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, target) -> int:
+        while len(self._buffer) < len(target):
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._number += 1
+            if not line.strip():
+                continue
+            try:
+                record = _parse_record(line, self._number)
+                if set(record) != self._column_set:
+                    raise ImportFormatError(f"Regel {self._number} heeft andere velden dan de eerste regel")
+            except ImportFormatError as e:
+                # Bewaard voor import_items: de COPY geeft zelf een algemene fout
+                self.error = e
+                raise
+            self._buffer += self._to_csv(record)
+        size = min(len(target), len(self._buffer))
+        target[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+    def _to_csv(self, record: dict) -> bytes:
+        out = io.StringIO()
+        csv.writer(out).writerow(
+            # None wordt een lege, ongequote waarde, wat COPY als NULL leest
+            ["" if record.get(col) is None else record[col] for col in self._columns]
+        )
+        return out.getvalue().encode("utf-8")
+
+
+def _check_columns(columns: List[str]) -> None:
+    unknown = [col for col in columns if col not in IMPORT_COLUMNS]
+    if unknown or "name" not in columns:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Ongeldige kolommen: {', '.join(unknown) or 'name ontbreekt'}"
+        )
+
+
+def import_items(db: Session, source: IO[bytes], fmt: str = "csv") -> dict:
+    """Laad items via COPY in een staging tabel en upsert ze op naam.
+
+    Alleen de meegegeven kolommen worden bij bestaande items overschreven.
+    Bij dubbele namen in het bestand wint de laatste regel.
+
+    items.name is niet uniek, dus twee gelijktijdige imports zouden dezelfde
+    nieuwe naam allebei kunnen inserten. Een advisory lock laat imports
+    daarom na elkaar lopen (een tweede import wacht op de eerste).
+    """
+    started = time.perf_counter()
+
+    reader = None
+    try:
+        if fmt == "csv":
+            header = source.readline().decode("utf-8-sig").strip()
+            columns = next(csv.reader([header]), [])
+            data = source
+        elif fmt == "ndjson":
+            lines = iter(source.readline, b"")
+            first = next((line for line in lines if line.strip()), b"{}")
+            columns = list(_parse_record(first, 1).keys())
+            reader = NDJSONToCSV(_chain(first, lines), columns)
+            data = io.BufferedReader(reader)
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Formaat moet csv of ndjson zijn"
+            )
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Bestand is geen geldige UTF-8"
+        )
+    except ImportFormatError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    _check_columns(columns)
+
+    column_list = ", ".join(columns)
+    # Voorraad van hot items staat in shards en wordt hier niet overschreven
+    updates = ", ".join(
+        "stock = CASE WHEN i.is_hot THEN i.stock ELSE s.stock END" if col == "stock" else f"{col} = s.{col}"
+        for col in columns if col != "name"
+    )
+    insert_values = ", ".join(
+        {
+            "stock": "coalesce(s.stock, 0)",
+            "is_active": "coalesce(s.is_active, true)",
+        }.get(col, f"s.{col}")
+        for col in columns
+    )
+    insert_columns = column_list
+    for col, default in (("stock", "0"), ("is_active", "true")):
+        if col not in columns:
+            insert_columns += f", {col}"
+            insert_values += f", {default}"
+
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", (IMPORT_LOCK,))
+        cursor.execute(STAGING_TABLE)
+        cursor.copy_expert(f"COPY items_import ({column_list}) FROM STDIN WITH (FORMAT csv)", data)
+        rows = cursor.rowcount
+
+        cursor.execute(f"""
+            WITH src AS (
+                SELECT DISTINCT ON (name) * FROM items_import ORDER BY name, line DESC
+            ), updated AS (
+                UPDATE items i
+                SET {updates + ", " if updates else ""}updated_at = now() at time zone 'utc'
+                FROM src s
+                WHERE i.name = s.name
+                RETURNING i.name
+            ), inserted AS (
+                INSERT INTO items ({insert_columns}, created_at)
+                SELECT {insert_values}, now() at time zone 'utc'
+                FROM src s
+                WHERE s.name NOT IN (SELECT name FROM updated)
+                RETURNING 1
+            )
+            SELECT (SELECT count(*) FROM updated), (SELECT count(*) FROM inserted)
+        """)
+        updated, inserted = cursor.fetchone()
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        if isinstance(e, HTTPException):
+            raise
+        error = e if isinstance(e, ImportFormatError) else getattr(reader, "error", None)
+        if error is not None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
+        # Database fout alleen in de log, niet naar de client
+        logger.exception("Item import mislukt")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Import mislukt: controleer de kolommen en waarden in het bestand"
+        )
+    finally:
+        cursor.close()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "rows": rows,
+        "inserted": inserted,
+        "updated": updated,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(rows / elapsed, 1) if elapsed else None,
+    }
+
+
+def export_items(fmt: str = "csv", batch_size: int = 1000, stats: Optional[dict] = None) -> Iterator[str]:
+    """Stream alle items als CSV of NDJSON via een server-side cursor.
+
+    Opent een eigen sessie, omdat de generator pas na de request handler
+    wordt uitgelezen. Als stats is meegegeven komt daar het aantal rijen in.
+    """
+    db = SessionLocal()
+    started = time.perf_counter()
+    rows = 0
+    try:
+        result = db.execute(
+            select(*[getattr(Item, col) for col in EXPORT_COLUMNS])
+            .order_by(Item.created_at, Item.id)
+            .execution_options(stream_results=True, yield_per=batch_size)
+        )
+
+        out = io.StringIO()
+        writer = csv.writer(out)
+        if fmt == "csv":
+            writer.writerow(EXPORT_COLUMNS)
+
+        for partition in result.partitions():
+            for row in partition:
+                if fmt == "csv":
+                    writer.writerow(["" if value is None else value for value in row])
+                else:
+                    out.write(json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=str) + "\n")
+            rows += len(partition)
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate()
+
+        if out.tell():
+            yield out.getvalue()  # alleen de header, lege catalogus
+    finally:
+        db.close()
+        elapsed = time.perf_counter() - started
+        if stats is not None:
+            stats.update(rows=rows, seconds=elapsed)
+        logger.info(
+            "Item export: %d rijen in %.2fs (%.0f rijen/s)",
+            rows, elapsed, rows / elapsed if elapsed else 0,
+        )
+
+
+def _chain(first: bytes, rest: Iterator[bytes]) -> Iterator[bytes]:
+    yield first
+    yield from rest
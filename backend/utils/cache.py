@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Set
+
+
+class LRUCache:
+    """Begrensde in-process LRU cache met TTL en tag-gebaseerde invalidatie.
+
+    Elke entry kan tags krijgen (bijv. een item id), zodat schrijfacties
+    precies de entries kunnen weggooien die ze raken. Met recent_window
+    onthoudt de cache zo lang welke tags geïnvalideerd zijn (zie
+    recently_invalidated).
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, recent_window: float = 0.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.recent_window = recent_window
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._tags: Dict[Hashable, Set[Hashable]] = {}
+        self._invalidated: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._cleared_at = float("-inf")
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at, _ = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[Hashable] = ()) -> None:
+        tags = frozenset(tags)
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, time.monotonic() + self.ttl, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._data) > self.maxsize:
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+                self.invalidations += 1
+
+    def invalidate_tag(self, tag: Hashable) -> None:
+        with self._lock:
+            for key in list(self._tags.get(tag, ())):
+                self._remove(key)
+                self.invalidations += 1
+            if self.recent_window:
+                now = time.monotonic()
+                self._invalidated[tag] = now
+                self._invalidated.move_to_end(tag)
+                # Oudste eerst: weg zodra ze buiten het venster vallen
+                while next(iter(self._invalidated.values())) < now - self.recent_window:
+                    self._invalidated.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.invalidations += len(self._data)
+            self._data.clear()
+            self._tags.clear()
+            if self.recent_window:
+                self._invalidated.clear()
+                self._cleared_at = time.monotonic()
+
+    def recently_invalidated(self, tags: Iterable[Hashable]) -> bool:
+        """Is een van de tags (of de hele cache) in de laatste recent_window
+        seconden geïnvalideerd?"""
+        if not self.recent_window:
+            return False
+        since = time.monotonic() - self.recent_window
+        with self._lock:
+            if self._cleared_at >= since:
+                return True
+            return any(self._invalidated.get(tag, since - 1) >= since for tag in tags)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, key: Hashable) -> None:
+        # Aanroeper houdt de lock al vast
+        _, _, tags = self._data.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
@@ -0,0 +1,88 @@
+import threading
+import time
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+
+
+class PoolStats:
+    """Wachttijd bij het uitchecken van een verbinding uit de pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record(self, waited: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds, 6),
+                "avg_wait_seconds": round(self.wait_seconds / self.checkouts, 6) if self.checkouts else None,
+                "max_wait_seconds": round(self.max_wait_seconds, 6),
+            }
+
+
+def timed_pool(base, stats: PoolStats):
+    """Subclass van een QueuePool die de wachttijd per checkout bijhoudt.
+
+    Een eigen class per engine, zodat recreate() (na dispose) dezelfde
+    stats blijft gebruiken.
+    """
+
+    class TimedPool(base):
+        pool_stats = stats
+
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except PoolTimeout:
+                self.pool_stats.record(time.perf_counter() - started, timed_out=True)
+                raise
+            self.pool_stats.record(time.perf_counter() - started)
+            return connection
+
+    TimedPool.__name__ = f"Timed{base.__name__}"
+    return TimedPool
+
+
+def timed_queue_pool(stats: PoolStats):
+    return timed_pool(QueuePool, stats)
+
+
+def timed_async_queue_pool(stats: PoolStats):
+    return timed_pool(AsyncAdaptedQueuePool, stats)
+
+
+def pool_status(engine) -> dict:
+    """Bezetting van de pool van een (sync of async) engine"""
+    pool = engine.pool
+    status = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        capacity = pool.size() + max(pool._max_overflow, 0)
+        checked_out = pool.checkedout()
+        status.update(
+            size=pool.size(),
+            max_overflow=pool._max_overflow,
+            checked_out=checked_out,
+            checked_in=pool.checkedin(),
+            overflow=pool.overflow(),
+            utilization=round(checked_out / capacity, 3) if capacity else None,
+        )
+    stats = getattr(pool, "pool_stats", None)
+    if stats is not None:
+        status.update(stats.snapshot())
+    return status
@@ -0,0 +1,47 @@
+import os
+
+from sqlalchemy import func, select, text, union_all
+from sqlalchemy.orm import Session
+
+from models.items import ItemFacetCount, ItemFacetDelta
+
+FACET_COMPACT_INTERVAL = float(os.getenv("FACET_COMPACT_INTERVAL", "5"))
+# pg_try_advisory_xact_lock sleutel: per ronde compact maar één worker
+FACET_COMPACT_LOCK = 7_004_001
+
+
+def facet_counts_stmt():
+    """Actuele tellingen: de opgetelde tabel plus de openstaande deltas"""
+    parts = union_all(
+        select(ItemFacetCount.category, ItemFacetCount.price_bucket,
+               ItemFacetCount.in_stock, ItemFacetCount.item_count.label("item_count")),
+        select(ItemFacetDelta.category, ItemFacetDelta.price_bucket,
+               ItemFacetDelta.in_stock, ItemFacetDelta.delta.label("item_count")),
+    ).subquery()
+    total = func.sum(parts.c.item_count).label("item_count")
+    return (
+        select(parts.c.category, parts.c.price_bucket, parts.c.in_stock, total)
+        .group_by(parts.c.category, parts.c.price_bucket, parts.c.in_stock)
+        .having(func.sum(parts.c.item_count) > 0)
+    )
+
+
+def compact_facet_deltas(db: Session) -> int:
+    """Tel de openstaande deltas op in item_facet_counts (één statement).
+    Geeft het aantal verwerkte delta rijen terug."""
+    moved = db.execute(text("""
+        WITH moved AS (
+            DELETE FROM item_facet_deltas
+            RETURNING category, price_bucket, in_stock, delta
+        ), summed AS (
+            INSERT INTO item_facet_counts (category, price_bucket, in_stock, item_count)
+            SELECT category, price_bucket, in_stock, sum(delta)
+            FROM moved
+            GROUP BY 1, 2, 3
+            ON CONFLICT (category, price_bucket, in_stock)
+            DO UPDATE SET item_count = item_facet_counts.item_count + EXCLUDED.item_count
+        )
+        SELECT count(*) FROM moved
+    """)).scalar()
+    db.commit()
+    return moved
@@ -0,0 +1,79 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Tuple
+
+Batch = List[Tuple[Any, Future]]
+
+
+class GroupCommitQueue:
+    """Verzamelt writes van veel requests en laat één writer thread ze per
+    batch afhandelen, zodat er één commit (en fsync) per batch is in plaats
+    van per request.
+
+    De handler krijgt een lijst (payload, future) en moet voor elke future
+    een resultaat of exception zetten. Futures die de handler open laat
+    (bijv. omdat de handler zelf crasht) krijgen de exception van de handler.
+    Een future die de aanroeper nog in de queue geannuleerd heeft, komt niet
+    meer in een batch; na cancel() == True is de write dus zeker niet gedaan.
+    """
+
+    def __init__(self, handler: Callable[[Batch], None], max_batch: int = 100, max_wait: float = 0.005):
+        self.handler = handler
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: "queue.Queue[Tuple[Any, Future]]" = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+
+    def submit(self, payload: Any) -> Future:
+        self._ensure_started()
+        future = Future()
+        self._queue.put((payload, future))
+        return future
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0,
+        }
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            # Vanaf hier kan cancel() niet meer; geannuleerde futures overslaan
+            batch = [(payload, future) for payload, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            self.batches += 1
+            self.items += len(batch)
+            try:
+                self.handler(batch)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
@@ -0,0 +1,64 @@
+import threading
+from typing import Any, Callable, Hashable, Tuple
+
+from fastapi import HTTPException, status
+
+from utils.cache import LRUCache
+
+
+class IdempotencyStore:
+    """Onthoudt resultaten per idempotency key, zodat een herhaalde request
+    het opgeslagen antwoord terugkrijgt in plaats van opnieuw uitgevoerd te
+    worden. Gelijktijdige requests met dezelfde key wachten op de eerste.
+
+    Alleen geslaagde resultaten worden bewaard; bij een fout mag de client
+    het met dezelfde key opnieuw proberen.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 86400, wait_timeout: float = 30):
+        self._responses = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.wait_timeout = wait_timeout
+
+    def run(self, key: Hashable, fingerprint: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Voer fn één keer uit per key. Geeft (resultaat, replayed) terug."""
+        while True:
+            with self._lock:
+                stored = self._responses.get(key)
+                if stored is None:
+                    event = self._inflight.get(key)
+                    owner = event is None
+                    if owner:
+                        event = self._inflight[key] = threading.Event()
+
+            if stored is not None:
+                stored_fingerprint, result = stored
+                if stored_fingerprint != fingerprint:
+                    raise HTTPException(
+                        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                        detail="Idempotency-Key is al gebruikt voor een andere request"
+                    )
+                return result, True
+
+            if not owner:
+                if not event.wait(self.wait_timeout):
+                    raise HTTPException(
+                        status_code=status.HTTP_409_CONFLICT,
+                        detail="Request met deze Idempotency-Key wordt nog verwerkt"
+                    )
+                # Eerste request is klaar (of mislukt), opnieuw kijken
+                continue
+
+            try:
+                result = fn()
+                self._responses.set(key, (fingerprint, result))
+                return result, False
+            finally:
+                with self._lock:
+                    del self._inflight[key]
+                event.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._responses.stats(), "inflight": len(self._inflight)}
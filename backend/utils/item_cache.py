@@ -0,0 +1,36 @@
+import os
+from uuid import UUID
+
+from database import replica_router
+from utils.cache import LRUCache
+
+# Catalogus cache (per worker). Schrijfacties invalideren precies de
+# geraakte entries, de TTL begrenst hoe oud andere workers kunnen zijn.
+# Met read replicas onthoudt hij ook wat net geïnvalideerd is: zo lang een
+# replica de wijziging nog kan missen, vullen we die entries vanaf de
+# primary (anders staat de oude versie er weer een hele TTL in).
+item_cache = LRUCache(
+    maxsize=int(os.getenv("ITEM_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("ITEM_CACHE_TTL", "60")),
+    recent_window=replica_router.read_after_seconds if replica_router.replicas else 0.0,
+)
+
+# Cache tags
+OFFSET_PAGES = "offset-pages"    # offset pagina's, volgorde niet stabiel
+KEYSET_PAGES = "keyset-pages"    # alle keyset pagina's
+KEYSET_TAIL = "keyset-tail"      # laatste keyset pagina, hier komen nieuwe items
+
+
+def invalidate_item(item_id: UUID, listing_changed: bool = False, stock_only: bool = False) -> None:
+    """Gooi cache entries weg die door een schrijfactie op item_id geraakt worden.
+
+    Bij alleen een voorraadwijziging (orders, reserveringen) blijven de
+    offset pagina's staan: de voorraad daarop mag een TTL oud zijn, anders
+    leegt elke bestelling alle offset pagina's.
+    """
+    item_cache.invalidate_tag(item_id)
+    if listing_changed or not stock_only:
+        item_cache.invalidate_tag(OFFSET_PAGES)
+    if listing_changed:
+        # Item komt erbij op een onbekende plek in de keyset volgorde
+        item_cache.invalidate_tag(KEYSET_PAGES)
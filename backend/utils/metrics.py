@@ -0,0 +1,262 @@
+import bisect
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import Match
+
+logger = logging.getLogger(__name__)
+
+# Waarschuwing in de log als één request meer queries doet (N+1 verklikker)
+SQL_QUERY_WARN_THRESHOLD = int(os.getenv("SQL_QUERY_WARN_THRESHOLD", "20"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+STREAM_BUCKETS = (1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0)
+
+# Responses met deze content types (SSE, exports) blijven lang open; die
+# tellen apart, anders vertekenen ze in-flight en de latency histogrammen
+STREAM_MEDIA_TYPES = (b"text/event-stream", b"text/csv", b"application/x-ndjson")
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def header(self) -> list:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, labels: Tuple = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list:
+        with self._lock:
+            values = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_labels(self.label_names, key)} {value}" for key, value in values
+        ]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, help, labels=()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, labels: Tuple = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, labels: Tuple = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+    def render(self) -> list:
+        with self._lock:
+            values = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_labels(self.label_names, key)} {value}" for key, value in values
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        # Per label combinatie: [telling per bucket (niet cumulatief)..., +Inf, som]
+        self._values: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, labels: Tuple = ()) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> list:
+        with self._lock:
+            values = [(key, list(series)) for key, series in self._values.items()]
+        lines = self.header()
+        for key, series in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series[:-1]):
+                cumulative += count
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {series[-1]}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.register(Counter(
+    "http_requests_total", "Aantal requests per route en status", ("method", "route", "status")))
+http_latency = registry.register(Histogram(
+    "http_request_duration_seconds", "Duur van requests per route", ("method", "route")))
+http_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "Requests die nu in behandeling zijn (zonder streams)"))
+http_streams_open = registry.register(Gauge(
+    "http_streams_open", "Streaming responses die nu open staan (SSE, exports)"))
+http_stream_duration = registry.register(Histogram(
+    "http_stream_duration_seconds", "Duur van streaming responses per route", ("method", "route"),
+    STREAM_BUCKETS))
+db_statements = registry.register(Counter(
+    "db_statements_total", "Aantal SQL statements per route", ("route",)))
+db_seconds = registry.register(Counter(
+    "db_duration_seconds_total", "Tijd in SQL statements per route", ("route",)))
+db_statements_per_request = registry.register(Histogram(
+    "db_statements_per_request", "SQL statements per request", ("route",), QUERY_BUCKETS))
+
+
+class RequestStats:
+    __slots__ = ("statements", "db_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+
+
+# Gekopieerd naar de threadpool van sync endpoints; het object zelf wordt
+# gedeeld, dus tellingen uit de thread komen terug bij de middleware
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+# Op de Engine class, dus voor alle engines (sync, async, replicas)
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        started = getattr(context, "_metrics_started", None)
+        if started is not None:
+            stats.db_seconds += time.perf_counter() - started
+
+
+def _route_template(app, scope) -> str:
+    route = scope.get("route")
+    if route is None:
+        for candidate in getattr(app, "routes", ()):
+            if candidate.matches(scope)[0] == Match.FULL:
+                route = candidate
+                break
+    return getattr(route, "path", "onbekend")
+
+
+def _is_stream(headers) -> bool:
+    for name, value in headers:
+        if name.lower() == b"content-type":
+            return value.split(b";")[0].strip().lower() in STREAM_MEDIA_TYPES
+    return False
+
+
+class MetricsMiddleware:
+    """ASGI middleware: latency, status en SQL tellingen per route template
+    (dus /api/items/{item_id}, niet elk id apart). Streaming responses gaan
+    vanaf de response headers naar http_streams_open en
+    http_stream_duration_seconds in plaats van in-flight en latency."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status_code = 500
+        streaming = False
+
+        async def send_wrapper(message):
+            nonlocal status_code, streaming
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if _is_stream(message.get("headers", ())):
+                    streaming = True
+                    http_in_flight.dec()
+                    http_streams_open.inc()
+            await send(message)
+
+        http_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            if streaming:
+                http_streams_open.dec()
+            else:
+                http_in_flight.dec()
+            _request_stats.reset(token)
+
+            route = _route_template(scope.get("app"), scope)
+            method = scope["method"]
+            http_requests.inc((method, route, str(status_code)))
+            if streaming:
+                http_stream_duration.observe(elapsed, (method, route))
+            else:
+                http_latency.observe(elapsed, (method, route))
+            db_statements.inc((route,), stats.statements)
+            db_seconds.inc((route,), stats.db_seconds)
+            db_statements_per_request.observe(stats.statements, (route,))
+            if stats.statements > SQL_QUERY_WARN_THRESHOLD:
+                logger.warning(
+                    "%s %s deed %d SQL statements (drempel %d), mogelijk N+1",
+                    method, route, stats.statements, SQL_QUERY_WARN_THRESHOLD,
+                )
@@ -0,0 +1,85 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+
+import psycopg2
+import psycopg2.extensions
+
+from database import engine
+
+logger = logging.getLogger(__name__)
+
+# Kanaal waarop de trigger op orders statuswijzigingen publiceert
+CHANNEL = "order_status"
+
+
+class OrderEventHub:
+    """Eén LISTEN verbinding per worker, die statuswijzigingen doorzet naar
+    alle open SSE streams. Zo kost een luisterende klant geen eigen
+    database verbinding."""
+
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def subscribe(self, user_id, is_admin: bool = False) -> asyncio.Queue:
+        """Abonneer de huidige event loop; admins krijgen alle orders"""
+        self._ensure_started()
+        queue = asyncio.Queue(maxsize=100)
+        with self._lock:
+            self._subscribers[queue] = (asyncio.get_running_loop(), str(user_id), is_admin)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        with self._lock:
+            self._subscribers.pop(queue, None)
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="order-events", daemon=True)
+                self._thread.start()
+
+    def _publish(self, event: dict) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.items())
+        for queue, (loop, user_id, is_admin) in subscribers:
+            if is_admin or event.get("user_id") == user_id:
+                loop.call_soon_threadsafe(self._offer, queue, event)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, event: dict) -> None:
+        # Een trage client mag de rest niet ophouden: dan vervalt het event
+        if not queue.full():
+            queue.put_nowait(event)
+
+    def _run(self) -> None:
+        while True:
+            conn = None
+            try:
+                # Hele URL als DSN, zodat query parameters (sslmode, options, ...) meegaan
+                conn = psycopg2.connect(
+                    engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+                )
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                conn.cursor().execute(f"LISTEN {CHANNEL}")
+                while True:
+                    if select.select([conn], [], [], 5) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        self._publish(json.loads(notify.payload))
+            except Exception:
+                logger.exception("LISTEN verbinding verbroken, opnieuw verbinden")
+                time.sleep(1)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+
+order_events = OrderEventHub()
@@ -0,0 +1,92 @@
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta
+from typing import Iterator, Optional
+
+from sqlalchemy import select
+
+from database import SessionLocal
+from models.orders import Order, OrderItem, ArchivedOrder, ArchivedOrderItem
+
+ORDER_COLUMNS = [
+    "id", "user_id", "status", "total_amount", "street", "house_number",
+    "postal_code", "city", "country", "created_at", "updated_at",
+]
+LINE_COLUMNS = ["id", "item_id", "product_name", "product_price", "quantity"]
+CSV_HEADER = ["order_id"] + ORDER_COLUMNS[1:] + ["line_id"] + LINE_COLUMNS[1:]
+
+
+def _rows(db, order_model, item_model, date_from, date_to, status, batch_size):
+    stmt = (
+        select(
+            *[getattr(order_model, col) for col in ORDER_COLUMNS],
+            *[getattr(item_model, col) for col in LINE_COLUMNS],
+        )
+        .outerjoin(
+            item_model,
+            (item_model.order_id == order_model.id)
+            & (item_model.order_created_at == order_model.created_at),
+        )
+        .order_by(order_model.created_at, order_model.id)
+        .execution_options(stream_results=True, yield_per=batch_size)
+    )
+    if date_from:
+        stmt = stmt.where(order_model.created_at >= datetime.combine(date_from, datetime.min.time()))
+    if date_to:
+        stmt = stmt.where(order_model.created_at < datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+    if status:
+        stmt = stmt.where(order_model.status == status)
+    return db.execute(stmt)
+
+
+def export_orders(
+    fmt: str = "ndjson",
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    status: Optional[str] = None,
+    batch_size: int = 1000,
+) -> Iterator[str]:
+    """Stream orders met hun regels als NDJSON (één order per regel) of CSV
+    (één orderregel per rij) via een server-side cursor.
+
+    Gearchiveerde maanden komen eerst (die zijn ouder), daarna de hete
+    tabellen. Er staat nooit meer dan één batch plus één order in geheugen.
+    """
+    db = SessionLocal()
+    try:
+        out = io.StringIO()
+        writer = csv.writer(out)
+        if fmt == "csv":
+            writer.writerow(CSV_HEADER)
+
+        current = None
+        width = len(ORDER_COLUMNS)
+        for order_model, item_model in ((ArchivedOrder, ArchivedOrderItem), (Order, OrderItem)):
+            result = _rows(db, order_model, item_model, date_from, date_to, status, batch_size)
+            for partition in result.partitions():
+                for row in partition:
+                    if fmt == "csv":
+                        writer.writerow(["" if value is None else value for value in row])
+                        continue
+
+                    # Rijen komen gesorteerd per order binnen, dus een order is
+                    # compleet zodra het volgende order id verschijnt
+                    if current is None or current["id"] != row[0]:
+                        if current is not None:
+                            out.write(json.dumps(current, default=str) + "\n")
+                        current = dict(zip(ORDER_COLUMNS, row[:width]))
+                        current["items"] = []
+                    if row[width] is not None:
+                        current["items"].append(dict(zip(LINE_COLUMNS, row[width:])))
+
+                yield out.getvalue()
+                out.seek(0)
+                out.truncate()
+
+        if current is not None:
+            out.write(json.dumps(current, default=str) + "\n")
+        if out.tell():
+            yield out.getvalue()
+    finally:
+        db.close()
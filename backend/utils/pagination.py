@@ -0,0 +1,54 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, status
+
+
+def _encode(values: list) -> str:
+    raw = json.dumps(values).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode(cursor: str) -> list:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Ongeldige cursor"
+    )
+
+
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+    """Maak een opaque cursor van de laatste (created_at, id) van een pagina"""
+    return _encode([created_at.isoformat(), str(id)])
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Lees een cursor terug naar (created_at, id)"""
+    try:
+        created_at, id = _decode(cursor)
+        return datetime.fromisoformat(created_at), UUID(id)
+    except (ValueError, TypeError):
+        raise _invalid_cursor()
+
+
+def encode_email_cursor(email: str, id: UUID) -> str:
+    """Cursor voor lijsten die op (email, id) gesorteerd zijn"""
+    return _encode([email, str(id)])
+
+
+def decode_email_cursor(cursor: str) -> Tuple[str, UUID]:
+    """Lees een email cursor terug naar (email, id)"""
+    try:
+        email, id = _decode(cursor)
+        if not isinstance(email, str):
+            raise TypeError(email)
+        return email, UUID(id)
+    except (ValueError, TypeError):
+        raise _invalid_cursor()
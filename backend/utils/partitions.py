@@ -0,0 +1,160 @@
+import logging
+import os
+import re
+from datetime import date
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from database import engine
+
+logger = logging.getLogger(__name__)
+
+# Optioneel: tablespace op goedkope opslag voor gearchiveerde maanden
+ARCHIVE_TABLESPACE = os.getenv("ARCHIVE_TABLESPACE")
+
+# Hoe vaak elke worker controleert of de komende maanden een partitie hebben
+PARTITION_CHECK_INTERVAL = float(os.getenv("PARTITION_CHECK_INTERVAL", "21600"))
+# pg_try_advisory_xact_lock sleutel: maar één worker tegelijk doet de DDL
+PARTITION_LOCK = 7_013_001
+
+PARTITION_NAME = re.compile(r"^orders_(\d{4})_(\d{2})$")
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def ensure_partitions(db: Session, months_ahead: int = 3) -> List[str]:
+    """Maak de maandpartities voor deze en de komende maanden aan, zodat
+    nieuwe orders niet in de default partitie belanden.
+
+    Staan er toch orders in de default partitie (bijv. omdat dit een tijd
+    niet gedraaid heeft), dan kan Postgres voor die maand geen partitie
+    meer aanmaken. Die orders worden daarom eerst naar de nieuwe partitie
+    verplaatst, in dezelfde transactie.
+    """
+    # Niet lang op locks van lopende orders wachten; de volgende ronde probeert het opnieuw
+    db.execute(text("SET LOCAL lock_timeout = '5s'"))
+
+    this_month = date.today().replace(day=1)
+    first = db.execute(text("SELECT min(created_at) FROM orders_default")).scalar()
+    start = min(this_month, first.date().replace(day=1)) if first else this_month
+
+    months = []
+    month = start
+    while month <= _add_months(this_month, months_ahead):
+        suffix = month.strftime("%Y_%m")
+        exists = db.execute(text("SELECT to_regclass(:name)"), {"name": f"orders_{suffix}"}).scalar()
+        if exists is None:
+            _create_month(db, month)
+        months.append(suffix)
+        month = _add_months(month, 1)
+    db.commit()
+    return months
+
+
+def _create_month(db: Session, month: date) -> None:
+    bounds = {"start": month, "end": _add_months(month, 1)}
+    stranded = db.execute(text(
+        "SELECT count(*) FROM orders_default WHERE created_at >= :start AND created_at < :end"
+    ), bounds).scalar()
+
+    if stranded:
+        logger.warning(
+            "%d orders van %s staan in de default partitie, verplaats ze naar de maandpartitie",
+            stranded, month.strftime("%Y-%m"),
+        )
+        # Geen nieuwe orders in de default partitie tot de maandpartitie er is
+        db.execute(text("LOCK TABLE orders_default, order_items_default IN EXCLUSIVE MODE"))
+        # Regels eerst, anders haalt de ON DELETE CASCADE ze weg
+        db.execute(text("CREATE TEMP TABLE moved_items (LIKE order_items) ON COMMIT DROP"))
+        db.execute(text("CREATE TEMP TABLE moved_orders (LIKE orders) ON COMMIT DROP"))
+        db.execute(text("""
+            WITH moved AS (
+                DELETE FROM order_items_default
+                WHERE order_created_at >= :start AND order_created_at < :end
+                RETURNING *
+            )
+            INSERT INTO moved_items SELECT * FROM moved
+        """), bounds)
+        db.execute(text("""
+            WITH moved AS (
+                DELETE FROM orders_default
+                WHERE created_at >= :start AND created_at < :end
+                RETURNING *
+            )
+            INSERT INTO moved_orders SELECT * FROM moved
+        """), bounds)
+
+    db.execute(
+        text("SELECT create_order_partitions(:month, 'orders', 'order_items')"),
+        {"month": month},
+    )
+
+    if stranded:
+        db.execute(text("INSERT INTO orders SELECT * FROM moved_orders"))
+        db.execute(text("INSERT INTO order_items SELECT * FROM moved_items"))
+        db.execute(text("DROP TABLE moved_items, moved_orders"))
+
+
+def hot_partitions(db: Session) -> List[date]:
+    """Maanden die nog als partitie aan orders hangen"""
+    names = db.execute(text("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'orders'::regclass
+        ORDER BY c.relname
+    """)).scalars()
+    months = []
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match:
+            months.append(date(int(match.group(1)), int(match.group(2)), 1))
+    return months
+
+
+def archive_month(db: Session, month: date) -> None:
+    """Koppel de partities van een maand los van orders/order_items en hang
+    ze aan orders_archive/order_items_archive. De data blijft leesbaar via
+    de archief tabellen, maar telt niet meer mee in de hete indexes."""
+    suffix = month.strftime("%Y_%m")
+    orders, items = f"orders_{suffix}", f"order_items_{suffix}"
+
+    # Eerst de regels: zolang die naar orders verwijzen kan de order
+    # partitie niet losgekoppeld worden
+    db.execute(text(f"ALTER TABLE order_items DETACH PARTITION {items}"))
+    db.execute(text(f"ALTER TABLE {items} DROP CONSTRAINT IF EXISTS order_items_order_fkey"))
+    db.execute(text(f"ALTER TABLE orders DETACH PARTITION {orders}"))
+
+    if ARCHIVE_TABLESPACE:
+        # Verplaatsen herschrijft de tabel, dus meteen compact
+        for table in (orders, items):
+            db.execute(text(f'ALTER TABLE {table} SET TABLESPACE "{ARCHIVE_TABLESPACE}"'))
+
+    # DDL kent geen bind parameters; de grenzen zijn zelf berekende datums
+    bounds = f"FOR VALUES FROM ('{month}') TO ('{_add_months(month, 1)}')"
+    db.execute(text(f"ALTER TABLE orders_archive ATTACH PARTITION {orders} {bounds}"))
+    db.execute(text(f"ALTER TABLE order_items_archive ATTACH PARTITION {items} {bounds}"))
+    db.commit()
+
+    if not ARCHIVE_TABLESPACE:
+        # VACUUM FULL kan niet in een transactie
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for table in (orders, items):
+                conn.execute(text(f"VACUUM (FULL, ANALYZE) {table}"))
+
+
+def archive_older_than(db: Session, months: int = 12) -> List[str]:
+    """Archiveer alle hete maanden die ouder zijn dan `months` maanden"""
+    cutoff = _add_months(date.today().replace(day=1), -months)
+    archived = []
+    for month in hot_partitions(db):
+        if month < cutoff:
+            logger.info("Archiveer orders van %s", month.strftime("%Y-%m"))
+            archive_month(db, month)
+            archived.append(month.strftime("%Y_%m"))
+    return archived
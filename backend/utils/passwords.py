@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+from fastapi import HTTPException, status
+
+logger = logging.getLogger(__name__)
+
+# Bcrypt cost; bij een wijziging worden hashes bij de volgende login herberekend
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Maximaal aantal hashes in de pool (rekenend + wachtend); daarboven 503
+PASSWORD_MAX_PENDING = int(os.getenv("PASSWORD_MAX_PENDING", "64"))
+PASSWORD_TIMEOUT = float(os.getenv("PASSWORD_TIMEOUT", "5"))
+
+
+def _hash(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _verify(password: str, hashed: str) -> bool:
+    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+
+
+def hash_rounds(hashed: str) -> int:
+    """Cost factor uit een bcrypt hash ($2b$12$...)"""
+    try:
+        return int(hashed.split("$")[2])
+    except (IndexError, ValueError):
+        return 0
+
+
+class PasswordHasher:
+    """Bcrypt in een eigen, begrensde process pool.
+
+    Een hash kost ~250 ms CPU; in de gedeelde threadpool van Starlette
+    zou een login piek de catalogus requests laten wachten. Hier wachten
+    hooguit `max_pending` hashes, de rest krijgt meteen een 503.
+    """
+
+    def __init__(self, workers: int = PASSWORD_WORKERS, max_pending: int = PASSWORD_MAX_PENDING,
+                 timeout: float = PASSWORD_TIMEOUT, rounds: int = BCRYPT_ROUNDS):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.rounds = rounds
+        self._pool = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: de worker processen erven geen threads of sockets
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def _submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is druk, probeer het later opnieuw",
+                headers={"Retry-After": "1"},
+            )
+
+        started = time.perf_counter()
+        with self._lock:
+            self.pending += 1
+
+        def done(_):
+            # Ook na een timeout loopt de hash door; pas dan komt het slot vrij
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+                self.seconds += elapsed
+                self.max_seconds = max(self.max_seconds, elapsed)
+            self._slots.release()
+
+        try:
+            future = self._executor().submit(fn, *args)
+        except Exception:
+            with self._lock:
+                self.pending -= 1
+            self._slots.release()
+            raise
+        future.add_done_callback(done)
+        return future
+
+    def _timed_out(self) -> HTTPException:
+        with self._lock:
+            self.timeouts += 1
+        logger.warning("Wachtwoord hash duurde langer dan %.1fs", self.timeout)
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is druk, probeer het later opnieuw",
+            headers={"Retry-After": "1"},
+        )
+
+    async def _wait_async(self, future):
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            raise self._timed_out()
+
+    async def hash_async(self, password: str) -> str:
+        return await self._wait_async(self._submit(_hash, password, self.rounds))
+
+    async def verify_async(self, password: str, hashed: str) -> bool:
+        return await self._wait_async(self._submit(_verify, password, hashed))
+
+    def needs_rehash(self, hashed: str) -> bool:
+        return hash_rounds(hashed) != self.rounds
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "rounds": self.rounds,
+                "pending": self.pending,
+                "max_pending": self.max_pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+                "avg_seconds": round(self.seconds / self.completed, 4) if self.completed else None,
+                "max_seconds": round(self.max_seconds, 4),
+            }
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,66 @@
+import logging
+import threading
+from typing import Callable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Achtergrond thread die elke `interval` seconden task(db) draait.
+
+    Met een lock_key draait per ronde maar één worker de taak: de rest
+    krijgt het advisory lock niet en slaat die ronde over. on_result krijgt
+    de return waarde van de taak (als die iets teruggeeft).
+    """
+
+    def __init__(self, name: str, task: Callable[[Session], object], interval: float,
+                 lock_key: Optional[int] = None, on_result: Optional[Callable] = None,
+                 run_at_start: bool = False):
+        self.name = name
+        self.task = task
+        self.interval = interval
+        self.lock_key = lock_key
+        self.on_result = on_result
+        self.run_at_start = run_at_start
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run_once(self):
+        db = SessionLocal()
+        try:
+            if self.lock_key is not None:
+                locked = db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": self.lock_key}).scalar()
+                if not locked:
+                    db.rollback()
+                    return None
+            result = self.task(db)
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("Periodieke taak %s mislukt", self.name)
+            return None
+        finally:
+            db.close()
+
+        if result and self.on_result:
+            self.on_result(result)
+        return result
+
+    def _run(self) -> None:
+        if self.run_at_start:
+            self.run_once()
+        while not self._stop.wait(self.interval):
+            self.run_once()
@@ -0,0 +1,195 @@
+import math
+import os
+import threading
+import time
+from typing import Dict, List
+
+from fastapi import HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# Login pogingen per venster, per email en per client IP
+LOGIN_LIMIT_EMAIL = int(os.getenv("LOGIN_LIMIT_EMAIL", "10"))
+LOGIN_LIMIT_IP = int(os.getenv("LOGIN_LIMIT_IP", "50"))
+LOGIN_LIMIT_WINDOW = float(os.getenv("LOGIN_LIMIT_WINDOW", "300"))  # seconden
+# Optioneel: gedeelde tellers voor meerdere workers
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL")
+# Aantal reverse proxies voor de app die X-Forwarded-For aanvullen. Bij 0
+# telt het adres van de verbinding zelf; de header kan de client vervalsen.
+TRUSTED_PROXY_DEPTH = int(os.getenv("TRUSTED_PROXY_DEPTH", "0"))
+
+
+def client_ip(request: Request, depth: int = TRUSTED_PROXY_DEPTH) -> str:
+    """IP van de client. Achter depth vertrouwde proxies is dat het adres
+    dat de buitenste proxy achteraan X-Forwarded-For heeft gezet; alles
+    links daarvan komt van de client en telt niet."""
+    if depth > 0:
+        hops = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+        if hops:
+            return hops[-depth] if len(hops) >= depth else hops[0]
+    return request.client.host if request.client else "onbekend"
+
+
+def _retry_after(now: float, window: float, limit: int, previous: int, current: int) -> float:
+    """Sliding window teller: het vorige venster telt mee naar rato van
+    hoeveel ervan nog in het schuivende venster valt. Geeft 0 als er nog
+    ruimte is, anders het aantal seconden tot er weer ruimte is."""
+    elapsed = now % window
+    estimate = previous * (1 - elapsed / window) + current
+    if estimate < limit:
+        return 0.0
+    if current >= limit or previous == 0:
+        return window - elapsed
+    # Moment waarop previous * (1 - t / window) + current onder de limiet zakt
+    return max(window * (1 - (limit - current) / previous) - elapsed, 0.001)
+
+
+class MemoryBackend:
+    """Per key alleen (venster, vorige telling, huidige telling).
+
+    Verlopen tellers gaan eens per venster weg en er zijn nooit meer dan
+    max_keys; daarboven vallen de eerst aangemaakte keys eruit.
+    """
+
+    blocking = False  # alleen een lock, geen I/O
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._counters: Dict[str, List] = {}
+        self._lock = threading.Lock()
+        self._pruned = None  # venster index van de laatste opruimronde
+
+    def hit(self, key: str, limit: int, window: float) -> float:
+        now = time.time()
+        index = int(now // window)
+        with self._lock:
+            if self._pruned != index:
+                self._pruned = index
+                self._prune(index)
+            counter = self._counters.get(key)
+            if counter is None:
+                if len(self._counters) >= self.max_keys:
+                    self._evict()
+                counter = self._counters[key] = [index, 0, 0]
+            elif counter[0] != index:
+                previous = counter[2] if counter[0] == index - 1 else 0
+                counter[:] = [index, previous, 0]
+
+            retry_after = _retry_after(now, window, limit, counter[1], counter[2])
+            if not retry_after:
+                counter[2] += 1
+            return retry_after
+
+    def reset(self, key: str, window: float) -> None:
+        with self._lock:
+            self._counters.pop(key, None)
+
+    def _prune(self, index: int) -> None:
+        # Aanroeper houdt de lock al vast. Tellers van twee vensters terug
+        # tellen niet meer mee en kunnen weg.
+        for key in [key for key, counter in self._counters.items() if counter[0] < index - 1]:
+            del self._counters[key]
+
+    def _evict(self) -> None:
+        # Aanroeper houdt de lock al vast. Alleen actieve keys (bijvoorbeeld
+        # veel verschillende emails): de eerst aangemaakte keys gaan eruit.
+        while len(self._counters) >= self.max_keys:
+            del self._counters[next(iter(self._counters))]
+
+
+class RedisBackend:
+    """Zelfde algoritme, met de tellers per venster in Redis.
+
+    Lezen, vergelijken en ophogen gebeurt in één Lua script, zodat
+    gelijktijdige pogingen (ook van andere workers) niet allemaal dezelfde
+    oude telling zien en samen over de limiet gaan.
+    """
+
+    # KEYS: vorig en huidig venster; ARGV: limiet, venster, verstreken deel
+    # van het venster. Geeft {vorige, huidige, opgehoogd}.
+    blocking = True  # netwerk round trip naar Redis
+
+    HIT_SCRIPT = """
+        local previous = tonumber(redis.call('GET', KEYS[1]) or '0')
+        local current = tonumber(redis.call('GET', KEYS[2]) or '0')
+        local limit, window, elapsed = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+        if previous * (1 - elapsed / window) + current < limit then
+            current = redis.call('INCR', KEYS[2])
+            redis.call('EXPIRE', KEYS[2], math.ceil(window * 2))
+            return {previous, current, 1}
+        end
+        return {previous, current, 0}
+    """
+
+    def __init__(self, url: str):
+        if redis is None:
+            raise RuntimeError("RATE_LIMIT_REDIS_URL is gezet, maar redis is niet geïnstalleerd")
+        self._client = redis.Redis.from_url(url)
+        self._hit = self._client.register_script(self.HIT_SCRIPT)
+
+    def hit(self, key: str, limit: int, window: float) -> float:
+        now = time.time()
+        index = int(now // window)
+        previous, current, incremented = self._hit(
+            keys=[f"rl:{key}:{index - 1}", f"rl:{key}:{index}"],
+            args=[limit, window, repr(now % window)],
+        )
+        if incremented:
+            return 0.0
+        return _retry_after(now, window, limit, int(previous), int(current))
+
+    def reset(self, key: str, window: float) -> None:
+        index = int(time.time() // window)
+        self._client.delete(f"rl:{key}:{index}", f"rl:{key}:{index - 1}")
+
+
+class LoginLimiter:
+    """Begrenst login pogingen per email en per client IP, voordat er een
+    database query of bcrypt hash gedaan wordt."""
+
+    def __init__(self, backend, email_limit: int = LOGIN_LIMIT_EMAIL,
+                 ip_limit: int = LOGIN_LIMIT_IP, window: float = LOGIN_LIMIT_WINDOW):
+        self.backend = backend
+        self.email_limit = email_limit
+        self.ip_limit = ip_limit
+        self.window = window
+
+    def check(self, request: Request, email: str) -> None:
+        """Tel een poging; geeft een 429 met Retry-After boven de limiet"""
+        retry_after = (
+            self.backend.hit(f"login-ip:{client_ip(request)}", self.ip_limit, self.window)
+            or self.backend.hit(f"login-email:{email.lower()}", self.email_limit, self.window)
+        )
+        if retry_after:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Te veel inlogpogingen, probeer het later opnieuw",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+    def succeeded(self, email: str) -> None:
+        """Na een geslaagde login telt de email opnieuw vanaf nul"""
+        self.backend.reset(f"login-email:{email.lower()}", self.window)
+
+    async def check_async(self, request: Request, email: str) -> None:
+        """Zoals check, maar zonder de event loop te blokkeren op Redis"""
+        if self.backend.blocking:
+            await run_in_threadpool(self.check, request, email)
+        else:
+            self.check(request, email)
+
+    async def succeeded_async(self, email: str) -> None:
+        """Zoals succeeded, maar zonder de event loop te blokkeren op Redis"""
+        if self.backend.blocking:
+            await run_in_threadpool(self.succeeded, email)
+        else:
+            self.succeeded(email)
+
+
+login_limiter = LoginLimiter(
+    RedisBackend(RATE_LIMIT_REDIS_URL) if RATE_LIMIT_REDIS_URL else MemoryBackend()
+)
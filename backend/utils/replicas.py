@@ -0,0 +1,185 @@
+import itertools
+import logging
+import math
+import threading
+from typing import List, Optional
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Achterstand van een replica in seconden; 0 als alles afgespeeld is.
+# NULL als de WAL receiver niet streamt: dan is ontvangen == afgespeeld
+# ook zonder dat de replica bijloopt. De status kolom is alleen zichtbaar
+# met pg_read_all_stats; zonder die rol telt alleen of de receiver draait.
+LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN NOT EXISTS (
+            SELECT 1 FROM pg_stat_wal_receiver WHERE coalesce(status, 'streaming') = 'streaming'
+        ) THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+# WAL posities als getal (bytes sinds 0/0), vergelijkbaar tussen de primary
+# en zijn replicas. Anders dan tijdstippen hangt dat niet van klokken af.
+CURRENT_LSN_SQL = "SELECT pg_current_wal_lsn() - '0/0'::pg_lsn"
+REPLAY_LSN_SQL = """
+    SELECT CASE WHEN pg_is_in_recovery() THEN pg_last_wal_replay_lsn() ELSE pg_current_wal_lsn() END
+        - '0/0'::pg_lsn
+"""
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class Replica:
+    def __init__(self, name: str, engine, session_factory, async_session_factory):
+        self.name = name
+        self.engine = engine
+        self.session_factory = session_factory
+        self.async_session_factory = async_session_factory
+        self.lag: Optional[float] = None  # None: onbekend of onbereikbaar
+        # Tot welke WAL positie de replica bij de laatste meting afgespeeld had
+        self.replayed_lsn: Optional[int] = None
+
+
+class ReplicaRouter:
+    """Verdeelt leesqueries round-robin over replicas die bijlopen.
+
+    Een achtergrond thread meet periodiek de achterstand per replica;
+    replicas boven max_lag (of onbereikbaar) worden overgeslagen en zonder
+    gezonde replica gaat alles naar de primary.
+
+    Read-your-writes: de client geeft de WAL positie van de primary na zijn
+    laatste schrijfactie mee (written_lsn, uit een cookie). Alleen replicas
+    die volgens de laatste meting tot die positie afgespeeld hebben komen
+    dan in aanmerking, anders leest hij van de primary. Dat werkt over
+    workers heen, er is geen gedeelde state nodig.
+    """
+
+    def __init__(self, replicas: List[Replica], primary_session_factory, primary_async_session_factory,
+                 max_lag: float = 5.0, check_interval: float = 2.0):
+        self.replicas = replicas
+        self.primary_session_factory = primary_session_factory
+        self.primary_async_session_factory = primary_async_session_factory
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self.primary_reads = 0
+        self.replica_reads = 0
+
+    @property
+    def read_after_seconds(self) -> float:
+        """Hoe lang written_lsn ertoe doet: daarna loopt elke replica die nog
+        gebruikt wordt voorbij de schrijfactie"""
+        return self.max_lag + self.check_interval
+
+    def _pick(self, written_lsn: Optional[int]) -> Optional[Replica]:
+        if not self.replicas:
+            return None
+        healthy = [r for r in self.replicas if r.lag is not None and r.lag <= self.max_lag]
+        if written_lsn:
+            healthy = [r for r in healthy if r.replayed_lsn is not None and r.replayed_lsn >= written_lsn]
+        if not healthy:
+            self.primary_reads += 1
+            return None
+        self.replica_reads += 1
+        return healthy[next(self._counter) % len(healthy)]
+
+    def session(self, written_lsn: Optional[int] = None):
+        replica = self._pick(written_lsn)
+        return (replica.session_factory if replica else self.primary_session_factory)()
+
+    def async_session(self, written_lsn: Optional[int] = None):
+        replica = self._pick(written_lsn)
+        return (replica.async_session_factory if replica else self.primary_async_session_factory)()
+
+    async def primary_lsn(self) -> int:
+        """Huidige WAL positie van de primary (na een commit: tot en met die commit)"""
+        async with self.primary_async_session_factory() as db:
+            return int((await db.execute(text(CURRENT_LSN_SQL))).scalar())
+
+    def status(self) -> dict:
+        return {
+            "max_lag": self.max_lag,
+            "primary_reads": self.primary_reads,
+            "replica_reads": self.replica_reads,
+            "replicas": [{"name": r.name, "lag": r.lag} for r in self.replicas],
+        }
+
+    def start(self) -> None:
+        """Start de lag metingen; tot de eerste meting leest alles van de primary"""
+        with self._lock:
+            if self.replicas and self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="replica-lag", daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _check(self) -> None:
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect() as conn:
+                    # Eerst de positie: de lag meting erna is dan niet ouder
+                    replayed_lsn = conn.execute(text(REPLAY_LSN_SQL)).scalar()
+                    lag = conn.execute(text(LAG_SQL)).scalar()
+            except Exception:
+                if replica.lag is not None:
+                    logger.exception("Replica %s onbereikbaar, lezen van de primary", replica.name)
+                replica.lag = None
+                replica.replayed_lsn = None
+                continue
+
+            if lag is None or replayed_lsn is None:
+                if replica.lag is not None:
+                    logger.warning("Replica %s ontvangt geen WAL, lezen van de primary", replica.name)
+                replica.lag = replica.replayed_lsn = None
+            else:
+                replica.lag = float(lag)
+                replica.replayed_lsn = int(replayed_lsn)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._check()
+            self._stop.wait(self.check_interval)
+
+
+class ReadYourWritesMiddleware:
+    """ASGI middleware: na een geslaagde schrijfactie krijgt de client de
+    WAL positie van de primary mee in een cookie, zodat elke worker daarna
+    alleen replicas kiest die tot die positie afgespeeld hebben. Alleen
+    nodig met replicas; leesrequests gaan er ongemoeid doorheen."""
+
+    def __init__(self, app, router: ReplicaRouter, cookie: str):
+        self.app = app
+        self.router = router
+        self.cookie = cookie
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            return await self.app(scope, receive, send)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                header = await self._cookie_header()
+                if header:
+                    message = {**message, "headers": [*message.get("headers", ()), (b"set-cookie", header)]}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _cookie_header(self) -> Optional[bytes]:
+        # De response start pas na het endpoint, dus na zijn commit
+        try:
+            lsn = await self.router.primary_lsn()
+        except Exception:
+            logger.exception("WAL positie van de primary onbekend, geen read-your-writes cookie")
+            return None
+        max_age = math.ceil(self.router.read_after_seconds)
+        return f"{self.cookie}={lsn}; HttpOnly; Max-Age={max_age}; Path=/; SameSite=lax".encode("latin-1")
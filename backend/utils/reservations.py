@@ -0,0 +1,253 @@
+import os
+from typing import Callable, Dict, List, Optional
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from utils.periodic import PeriodicTask
+
+RESERVATION_TTL = int(os.getenv("RESERVATION_TTL", "600"))  # seconden
+RESERVATION_SWEEP_INTERVAL = float(os.getenv("RESERVATION_SWEEP_INTERVAL", "10"))
+RESERVE_ATTEMPTS = 3
+# pg_try_advisory_xact_lock sleutel van de sweeper
+RESERVATION_SWEEP_LOCK = 7_016_001
+
+
+def shard_item(db: Session, item_id: UUID, shards: int) -> int:
+    """Maak een item hot: verdeel de huidige voorraad over `shards` shards"""
+    created = db.execute(text("""
+        WITH item AS (
+            UPDATE items SET is_hot = true
+            WHERE id = :item_id AND NOT is_hot
+            RETURNING id, stock
+        )
+        INSERT INTO item_stock_shards (item_id, shard, stock)
+        SELECT item.id, s, item.stock / :shards + CASE WHEN s < item.stock % :shards THEN 1 ELSE 0 END
+        FROM item, generate_series(0, :shards - 1) AS s
+        RETURNING shard
+    """), {"item_id": item_id, "shards": shards}).all()
+
+    if not created:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Item niet gevonden of al hot"
+        )
+    db.commit()
+    return len(created)
+
+
+def unshard_item(db: Session, item_id: UUID) -> int:
+    """Zet de shards terug in items.stock; kan alleen zonder open reserveringen"""
+    open_reservations = db.execute(
+        text("SELECT count(*) FROM stock_reservations WHERE item_id = :item_id"),
+        {"item_id": item_id},
+    ).scalar()
+    if open_reservations:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Item heeft nog open reserveringen"
+        )
+
+    stock = db.execute(text("""
+        WITH shards AS (
+            DELETE FROM item_stock_shards WHERE item_id = :item_id RETURNING stock
+        )
+        UPDATE items SET is_hot = false, stock = (SELECT coalesce(sum(stock), 0) FROM shards)
+        WHERE id = :item_id AND is_hot
+        RETURNING stock
+    """), {"item_id": item_id}).scalar()
+
+    if stock is None:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Hot item niet gevonden"
+        )
+    db.commit()
+    return stock
+
+
+def reserve(db: Session, user_id: UUID, item_id: UUID, quantity: int) -> dict:
+    """Claim voorraad uit een willekeurige shard met genoeg ruimte (alleen
+    voor actieve hot items).
+
+    SKIP LOCKED slaat shards over waar een andere koper net mee bezig is,
+    zodat kopers elkaar niet blokkeren. Lukt het niet, dan nog een paar
+    keer proberen voordat we 'uitverkocht' melden.
+    """
+    for _ in range(RESERVE_ATTEMPTS):
+        row = db.execute(text("""
+            WITH pick AS (
+                SELECT item_id, shard FROM item_stock_shards
+                WHERE item_id = :item_id AND stock >= :quantity
+                  AND EXISTS (SELECT 1 FROM items WHERE id = :item_id AND is_active AND is_hot)
+                ORDER BY random()
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            ), claimed AS (
+                UPDATE item_stock_shards s SET stock = s.stock - :quantity
+                FROM pick
+                WHERE s.item_id = pick.item_id AND s.shard = pick.shard
+                RETURNING s.shard
+            )
+            INSERT INTO stock_reservations (user_id, item_id, shard, quantity, expires_at)
+            SELECT :user_id, :item_id, shard, :quantity,
+                   now() AT TIME ZONE 'utc' + make_interval(secs => :ttl)
+            FROM claimed
+            RETURNING id, item_id, quantity, expires_at
+        """), {
+            "user_id": user_id,
+            "item_id": item_id,
+            "quantity": quantity,
+            "ttl": RESERVATION_TTL,
+        }).mappings().first()
+
+        if row is not None:
+            db.commit()
+            return dict(row)
+
+    db.rollback()
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Niet genoeg voorraad om te reserveren"
+    )
+
+
+def release(db: Session, user_id: UUID, reservation_id: UUID) -> None:
+    """Geef een reservering vrij en zet de voorraad terug in zijn shard"""
+    released = db.execute(text("""
+        WITH r AS (
+            DELETE FROM stock_reservations
+            WHERE id = :reservation_id AND user_id = :user_id
+            RETURNING item_id, shard, quantity
+        )
+        UPDATE item_stock_shards s SET stock = s.stock + r.quantity
+        FROM r
+        WHERE s.item_id = r.item_id AND s.shard = r.shard
+        RETURNING s.item_id
+    """), {"reservation_id": reservation_id, "user_id": user_id}).first()
+
+    if released is None:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Reservering niet gevonden"
+        )
+    db.commit()
+
+
+def consume(db: Session, user_id: UUID, quantities: Dict[UUID, int]) -> Dict[UUID, int]:
+    """Zet de reserveringen van een user om in een verkoop (binnen de order
+    transactie). Geeft de items terug die via reserveringen gedekt zijn.
+
+    Een te groot gereserveerd aantal gaat terug naar de shard, een te klein
+    aantal geeft een 409. Bij een rollback komen de reserveringen terug.
+    """
+    rows = db.execute(text("""
+        DELETE FROM stock_reservations
+        WHERE user_id = :user_id
+          AND item_id = ANY(CAST(:item_ids AS uuid[]))
+          AND expires_at > now() AT TIME ZONE 'utc'
+        RETURNING item_id, shard, quantity
+    """), {"user_id": user_id, "item_ids": [str(item_id) for item_id in quantities]}).all()
+
+    reserved: Dict[UUID, int] = {}
+    shard_of: Dict[UUID, int] = {}
+    for item_id, shard, quantity in rows:
+        reserved[item_id] = reserved.get(item_id, 0) + quantity
+        shard_of.setdefault(item_id, shard)
+
+    for item_id, quantity in reserved.items():
+        wanted = quantities[item_id]
+        if quantity < wanted:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Er is minder gereserveerd dan besteld"
+            )
+        if quantity > wanted:
+            db.execute(text("""
+                UPDATE item_stock_shards SET stock = stock + :surplus
+                WHERE item_id = :item_id AND shard = :shard
+            """), {"surplus": quantity - wanted, "item_id": item_id, "shard": shard_of[item_id]})
+
+    return {item_id: quantities[item_id] for item_id in reserved}
+
+
+def restock(db: Session, quantities: Dict[UUID, int]) -> None:
+    """Zet voorraad van hot items terug (bijv. bij annuleren), verdeeld over
+    alle shards zoals shard_item dat doet. Binnen de transactie van de
+    aanroeper; de shards worden in vaste volgorde gelockt."""
+    if not quantities:
+        return
+
+    params = {
+        "item_ids": [str(item_id) for item_id in quantities],
+        "quantities": list(quantities.values()),
+    }
+    db.execute(text("""
+        SELECT 1 FROM item_stock_shards
+        WHERE item_id = ANY(CAST(:item_ids AS uuid[]))
+        ORDER BY item_id, shard
+        FOR UPDATE
+    """), params)
+    db.execute(text("""
+        UPDATE item_stock_shards s
+        SET stock = s.stock + r.quantity / n.shards
+                    + CASE WHEN s.shard < r.quantity % n.shards THEN 1 ELSE 0 END
+        FROM unnest(CAST(:item_ids AS uuid[]), CAST(:quantities AS integer[])) AS r(item_id, quantity),
+             (SELECT item_id, count(*) AS shards FROM item_stock_shards
+              WHERE item_id = ANY(CAST(:item_ids AS uuid[])) GROUP BY item_id) n
+        WHERE s.item_id = r.item_id AND n.item_id = r.item_id
+    """), params)
+
+
+def sweep(db: Session) -> List[UUID]:
+    """Zet verlopen reserveringen terug in hun shard en werk de
+    weergavevoorraad (items.stock) van hot items bij. Geeft de items terug
+    waarvan de voorraad veranderd is.
+
+    Alleen items met een gewijzigde shard (dirty, gezet door de trigger)
+    worden opnieuw opgeteld. De vlag wordt in hetzelfde statement gewist;
+    een wijziging die daarna nog binnenkomt zet hem opnieuw.
+    """
+    db.execute(text("""
+        WITH expired AS (
+            DELETE FROM stock_reservations
+            WHERE expires_at <= now() AT TIME ZONE 'utc'
+            RETURNING item_id, shard, quantity
+        )
+        UPDATE item_stock_shards s SET stock = s.stock + e.quantity
+        FROM (SELECT item_id, shard, sum(quantity) AS quantity FROM expired GROUP BY 1, 2) e
+        WHERE s.item_id = e.item_id AND s.shard = e.shard
+    """))
+    changed = db.execute(text("""
+        WITH cleared AS (
+            UPDATE item_stock_shards SET dirty = false
+            WHERE dirty
+            RETURNING item_id
+        ), totals AS (
+            SELECT item_id, sum(stock) AS total FROM item_stock_shards
+            WHERE item_id IN (SELECT item_id FROM cleared)
+            GROUP BY item_id
+        )
+        UPDATE items i SET stock = t.total
+        FROM totals t
+        WHERE i.id = t.item_id AND i.stock <> t.total
+        RETURNING i.id
+    """)).scalars().all()
+    db.commit()
+    return changed
+
+
+class ReservationSweeper(PeriodicTask):
+    """Achtergrond thread die periodiek sweep() draait (één worker per ronde)"""
+
+    def __init__(self, interval: float = RESERVATION_SWEEP_INTERVAL,
+                 on_change: Optional[Callable[[List[UUID]], None]] = None):
+        super().__init__(
+            "reservation-sweeper", sweep, interval,
+            lock_key=RESERVATION_SWEEP_LOCK, on_result=on_change,
+        )
@@ -0,0 +1,181 @@
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from models.analytics import SalesRollupDelta
+
+ROLLUP_TABLES = ["sales_daily", "sales_item_daily", "sales_category_daily", "sales_city_daily"]
+
+SALES_ROLLUP_INTERVAL = float(os.getenv("SALES_ROLLUP_INTERVAL", "5"))
+# pg_try_advisory_xact_lock sleutel: per ronde verwerkt maar één worker
+SALES_ROLLUP_LOCK = 7_012_001
+
+# Telt een set orders op bij alle rollups in één statement, uit zowel de
+# hete als de gearchiveerde order tabellen. {source} levert (id, created_at,
+# sign) per order; sign is 1 (meetellen) of -1 (annulering). ORDER BY in
+# elke insert houdt de lock volgorde vast, zodat het niet deadlockt.
+ROLLUP_SQL = """
+    WITH src AS (
+        {source}
+    ), o AS (
+        SELECT o.id, o.created_at, o.created_at::date AS day, o.city, o.total_amount, src.sign
+        FROM src JOIN orders o ON o.id = src.id AND o.created_at = src.created_at
+        UNION ALL
+        SELECT o.id, o.created_at, o.created_at::date AS day, o.city, o.total_amount, src.sign
+        FROM src JOIN orders_archive o ON o.id = src.id AND o.created_at = src.created_at
+    ), oi AS (
+        SELECT order_id, order_created_at, item_id, product_name, product_price, quantity
+        FROM order_items
+        UNION ALL
+        SELECT order_id, order_created_at, item_id, product_name, product_price, quantity
+        FROM order_items_archive
+    ), l AS (
+        SELECT o.day, oi.item_id, oi.product_name, coalesce(i.category, '') AS category,
+               o.sign * oi.quantity AS units, o.sign * oi.product_price * oi.quantity AS revenue
+        FROM oi
+        JOIN o ON o.id = oi.order_id AND o.created_at = oi.order_created_at
+        LEFT JOIN items i ON i.id = oi.item_id
+    ), daily AS (
+        INSERT INTO sales_daily (day, orders, units, revenue)
+        SELECT od.day, od.orders, coalesce(ld.units, 0), od.revenue
+        FROM (SELECT day, sum(sign) AS orders, sum(sign * total_amount) AS revenue FROM o GROUP BY day) od
+        LEFT JOIN (SELECT day, sum(units) AS units FROM l GROUP BY day) ld USING (day)
+        ORDER BY od.day
+        ON CONFLICT (day) DO UPDATE SET
+            orders = sales_daily.orders + EXCLUDED.orders,
+            units = sales_daily.units + EXCLUDED.units,
+            revenue = sales_daily.revenue + EXCLUDED.revenue
+        RETURNING 1
+    ), per_item AS (
+        INSERT INTO sales_item_daily (day, item_id, product_name, units, revenue)
+        SELECT day, item_id, max(product_name), sum(units), sum(revenue)
+        FROM l
+        WHERE item_id IS NOT NULL
+        GROUP BY day, item_id
+        ORDER BY day, item_id
+        ON CONFLICT (day, item_id) DO UPDATE SET
+            product_name = EXCLUDED.product_name,
+            units = sales_item_daily.units + EXCLUDED.units,
+            revenue = sales_item_daily.revenue + EXCLUDED.revenue
+        RETURNING 1
+    ), per_category AS (
+        INSERT INTO sales_category_daily (day, category, units, revenue)
+        SELECT day, category, sum(units), sum(revenue)
+        FROM l
+        GROUP BY day, category
+        ORDER BY day, category
+        ON CONFLICT (day, category) DO UPDATE SET
+            units = sales_category_daily.units + EXCLUDED.units,
+            revenue = sales_category_daily.revenue + EXCLUDED.revenue
+        RETURNING 1
+    ), per_city AS (
+        INSERT INTO sales_city_daily (day, city, orders, revenue)
+        SELECT day, city, sum(sign), sum(sign * total_amount)
+        FROM o
+        GROUP BY day, city
+        ORDER BY day, city
+        ON CONFLICT (day, city) DO UPDATE SET
+            orders = sales_city_daily.orders + EXCLUDED.orders,
+            revenue = sales_city_daily.revenue + EXCLUDED.revenue
+        RETURNING 1
+    )
+    SELECT count(*) FROM src
+"""
+
+
+def record_orders(db: Session, orders: Iterable[Tuple[UUID, datetime]], sign: int = 1) -> None:
+    """Noteer orders (id, created_at) voor de rollups: sign=1 bij plaatsen,
+    sign=-1 bij annuleren.
+
+    Draait in de transactie van de aanroeper, zodat order en delta samen
+    committen of samen terugdraaien. Alleen een insert in
+    sales_rollup_deltas: gelijktijdige checkouts wachten zo niet op de rij
+    van vandaag. compact_sales_rollups() telt ze later op.
+    """
+    rows = [
+        {"order_id": order_id, "order_created_at": created_at, "sign": sign}
+        for order_id, created_at in orders
+    ]
+    if rows:
+        db.execute(insert(SalesRollupDelta), rows)
+
+
+def compact_sales_rollups(db: Session) -> int:
+    """Tel de openstaande deltas op in de rollups (één statement).
+    Geeft het aantal verwerkte deltas terug."""
+    moved = db.execute(text(ROLLUP_SQL.format(source="""
+        DELETE FROM sales_rollup_deltas
+        RETURNING order_id AS id, order_created_at AS created_at, sign
+    """))).scalar()
+    db.commit()
+    return moved
+
+
+def backfill(db: Session, batch_days: int = 7, progress: Optional[Callable] = None) -> dict:
+    """Bouw alle rollups opnieuw op uit orders, per blok van batch_days dagen.
+
+    Elk blok is een eigen transactie die de deltas tabel exclusief lockt:
+    nieuwe deltas (checkouts, annuleringen) en de compactor wachten dan even.
+    Binnen dat blok worden de rollup rijen en openstaande deltas van die
+    dagen weggegooid en uit de huidige orders opnieuw berekend, dus een
+    annulering tijdens de backfill telt nooit dubbel of negatief.
+    """
+    started = time.perf_counter()
+
+    first = db.execute(text(
+        "SELECT least((SELECT min(created_at) FROM orders), (SELECT min(created_at) FROM orders_archive))"
+    )).scalar()
+    today = db.execute(text("SELECT (now() AT TIME ZONE 'utc')::date")).scalar()
+    first_day = first.date() if first is not None else today
+
+    # Rollups van voor de eerste order kunnen weg
+    db.execute(text("LOCK TABLE sales_rollup_deltas IN EXCLUSIVE MODE"))
+    for table in ROLLUP_TABLES:
+        db.execute(text(f"DELETE FROM {table} WHERE day < :first_day"), {"first_day": first_day})
+    db.execute(
+        text("DELETE FROM sales_rollup_deltas WHERE order_created_at < :first_day"),
+        {"first_day": first_day},
+    )
+    db.commit()
+
+    total = 0
+    start = datetime.combine(first_day, datetime.min.time())
+    step = timedelta(days=batch_days)
+    # Tot en met morgen (utc), zodat ook de orders van vandaag meetellen
+    end_of_range = datetime.combine(today, datetime.min.time()) + timedelta(days=1)
+    while start < end_of_range:
+        end = min(start + step, end_of_range)
+        params = {"start": start, "end": end}
+        db.execute(text("LOCK TABLE sales_rollup_deltas IN EXCLUSIVE MODE"))
+        for table in ROLLUP_TABLES:
+            db.execute(text(f"DELETE FROM {table} WHERE day >= :start AND day < :end"), params)
+        db.execute(text(
+            "DELETE FROM sales_rollup_deltas WHERE order_created_at >= :start AND order_created_at < :end"
+        ), params)
+        count = db.execute(
+            text(ROLLUP_SQL.format(source="""
+                SELECT id, created_at, 1 AS sign FROM orders
+                WHERE created_at >= :start AND created_at < :end AND status <> 'cancelled'
+                UNION ALL
+                SELECT id, created_at, 1 AS sign FROM orders_archive
+                WHERE created_at >= :start AND created_at < :end AND status <> 'cancelled'
+            """)),
+            params,
+        ).scalar()
+        db.commit()
+        total += count
+        if progress:
+            progress(start.date(), end.date(), count)
+        start = end
+
+    elapsed = time.perf_counter() - started
+    return {
+        "orders": total,
+        "seconds": round(elapsed, 3),
+        "orders_per_sec": round(total / elapsed, 1) if elapsed else None,
+    }
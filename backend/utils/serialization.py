@@ -0,0 +1,62 @@
+import json
+import os
+from datetime import date, datetime
+from typing import Any, Iterable, List, Sequence
+from uuid import UUID
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Opt-in: lijst endpoints bouwen dan geen Pydantic model per rij, maar
+# serializen platte rijen direct naar JSON (zelfde wire format)
+FAST_JSON = os.getenv("FAST_JSON", "false").lower() == "true"
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Kan {type(value).__name__} niet naar JSON omzetten")
+
+
+def to_json(content: Any) -> bytes:
+    """Serialize naar dezelfde compacte JSON als FastAPI's JSONResponse"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+        default=_default,
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse die al geserialiseerde bytes ongewijzigd doorgeeft"""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return to_json(content)
+
+
+def rows_to_dicts(fields: Sequence[str], rows: Iterable[Sequence[Any]]) -> List[dict]:
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def encode_page(content: Any) -> Any:
+    """Geeft bij FAST_JSON al geserialiseerde bytes terug, anders de data zelf"""
+    return to_json(content) if FAST_JSON else content
+
+
+def respond(content: Any) -> Any:
+    """Bytes gaan zonder response_model validatie de deur uit"""
+    if isinstance(content, bytes):
+        return FastJSONResponse(content)
+    return content
@@ -0,0 +1,7 @@
+from models.user import User
+from schemas.user import UserResponse
+
+# Kolommen van UserResponse, voor RETURNING en platte selects zonder ORM
+# objecten (gedeeld door de user en admin routers)
+USER_FIELDS = list(UserResponse.model_fields)
+USER_COLUMNS = [getattr(User, field) for field in USER_FIELDS]
@@ -68,6 +68,8 @@ export default function Cart({
 
       const response = await fetch("http://127.0.0.1:8000/api/orders/", {
         method: "POST",
+        // Zodat de read_after cookie bewaard wordt voor het orderoverzicht
+        credentials: "include",
         headers: {
           "Content-Type": "application/json",
           Authorization: `Bearer ${token}`,
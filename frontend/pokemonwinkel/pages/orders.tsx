@@ -25,6 +25,8 @@ export default function Orders({ user }: OrdersProps) {
     try {
       const token = localStorage.getItem("token");
       const response = await fetch("http://127.0.0.1:8000/api/orders/", {
+        // Stuurt de read_after cookie van de laatste bestelling mee
+        credentials: "include",
         headers: {
           Authorization: `Bearer ${token}`,
         },